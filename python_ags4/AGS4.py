@@ -19,13 +19,17 @@
 # https://gitlab.com/ags-data-format-wg/ags-python-library
 
 import logging
+from collections.abc import Mapping
+from contextlib import contextmanager
+from io import TextIOWrapper
 
 logger = logging.getLogger(__name__)
 
 
 # Read functions #
 
-def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True):
+def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
+                 engine='stream', only_groups=None, columns=None, row_filter=None):
     """Load all the data in an AGS4 file to a dictionary of dictionaries.
 
     Each GROUP in the AGS4 file is assigned its own dictionary.
@@ -38,16 +42,44 @@ def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, r
     filepath_or_buffer : File path (str, pathlib.Path), or StringIO.
         Path to AGS4 file or any object with a read() method (such as an open
         file or StringIO).
+        Compressed files ('.gz', '.bz2', '.xz', or a '.zip' archive containing
+        a single AGS4 file) are decompressed while they are read.
     encoding : str, default='utf-8'
         Encoding of text file. This can be set to 'utf-8-sig' to read files that
         begin with a byte-order-mark.
     get_line_numbers : bool, default=False
         Add line number column to each table (for UNIT, TYPE, and DATA rows) and
-        return a dictionary with line numbers for GROUP and HEADING lines.
+        return a dictionary with line numbers for GROUP and HEADING lines. The
+        line numbers of each table are stored in an integer array (i.e.
+        array.array('q')) instead of a list.
     rename_duplicate_headers: bool, default=True
         Rename duplicate headers if found. Neither AGS4 tables nor Pandas
         dataframes allow duplicate headers, therefore a number will be appended
         to duplicates to make them unique.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use. The 'stream' engine tokenizes the whole file in a
+        single CSV reader pass, while the 'line' engine creates a new CSV reader
+        for each line. The 'mmap' engine memory-maps the file and splits most
+        lines without a CSV reader, and skips lines in groups that are not
+        selected without decoding them. It falls back to the 'stream' engine
+        for inputs that cannot be memory-mapped (e.g. StringIO or compressed
+        files). All engines return identical results, but the 'stream' and
+        'mmap' engines are significantly faster for large files.
+    only_groups : list or None (default=None)
+        An optional list of groups to load instead of all the groups in the
+        input file. Lines in other groups are skipped without being parsed.
+    columns : dict of lists or None (default=None)
+        An optional dictionary with the headings to load from each group (e.g.
+        {'SAMP': ['LOCA_ID', 'SAMP_TOP', 'SAMP_REF']}). The HEADING column is
+        always loaded and all the columns are loaded from groups that are not
+        in the dictionary.
+    row_filter : dict or callable or None (default=None)
+        An optional filter to select the DATA rows to load. If a dictionary
+        is provided (e.g. {'LOCA_ID': {'BH01', 'BH02'}}), then only DATA rows
+        with values in the specified sets are loaded from groups with those
+        headings. If a callable is provided, it is called with the group name
+        and a dictionary of the DATA row (headings as keys) and should return
+        True for the rows to load. UNIT and TYPE rows are always loaded.
 
     Returns
     -------
@@ -64,19 +96,10 @@ def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, r
         function.
     """
 
-    import csv
-    from io import StringIO
+    if engine not in _PARSER_ENGINES:
+        raise ValueError(f"Invalid engine '{engine}'. Should be one of {', '.join(_PARSER_ENGINES)}.")
 
-    if _is_file_like(filepath_or_buffer):
-        f = filepath_or_buffer
-        f.seek(0)
-        if hasattr(f, 'encoding') and getattr(f, 'encoding', None) != encoding and hasattr(f, 'reconfigure'):
-            f.reconfigure(encoding=encoding)
-        close_file = False
-    else:
-        # Read file with errors="replace" to catch UnicodeDecodeErrors
-        f = open(filepath_or_buffer, "r", encoding=encoding, errors="replace")
-        close_file = True
+    f, close_file = _open_file(filepath_or_buffer, encoding)
 
     try:
 
@@ -90,109 +113,18 @@ def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, r
         # the first column in order to preserve the AGS data format. Other
         # columns in certain groups have a preferred order as well)
 
-        # Initialize variable to track current group
-        group = None
-
-        for i, line in enumerate(f, start=1):
-            if _is_bytebuffer(line):
-                line = line.decode(encoding)
-
-            else:
-                # Strip byte-order mark from line, if present
-                line = _remove_byte_order_mark(line, encoding)
-
-            line = list(csv.reader(StringIO(line), quotechar='"'))[0]
-
-            if len(line) == 0:
-                # This indicates a blank line so assume that the current group has ended
-                group = None
-
-                continue
-
-            elif line[0] == 'GROUP':
-                group = line[1]
-
-                # Raise exception if duplicate group is found as previous copy
-                # of that group will be overwritten
-                if group in data.keys():
-                    msg = f"{group} group duplicated in Line {i}. Cannot parse file without overwriting data, "\
-                           "therefore please combine all duplicate groups first."
-
-                    logger.error(msg)
-                    raise AGS4Error(msg)
-
-                else:
-                    data[group] = {}
-
-                # Store GROUP line number (A default 'HEADING' entry is added to
-                # avoid KeyErrors in case of missing HEADING rows)
-                line_numbers[group] = {'GROUP': i, 'HEADING': '-'}
-
-            elif line[0] == 'HEADING':
-
-                if group is None:
-                    msg = f"HEADER row in Line {i} is not associated with a GROUP. "\
-                        "Please ensure that the GROUP name is defined in the line immediately preceding the HEADER row."
-
-                    logger.error(msg)
-                    raise AGS4Error(msg)
-
-                # Catch HEADER rows with duplicate entries as it will result in
-                # a dictionary with arrays of unequal lengths and cause a
-                # ValueError when trying to convert to a Pandas dataframe
-                if len(line) != len(set(line)):
-
-                    if rename_duplicate_headers is False:
-                        raise AGS4Error(f"HEADER row in {group} (Line {i}) has duplicate entries")
-
-                    logger.warning(f"HEADER row in {group} (Line {i}) has duplicate entries.")
-
-                    # Rename duplicate headers by appending a number
-                    item_count = {}
-
-                    for i, item in enumerate(line):
-                        if item not in item_count:
-                            item_count[item] = {'i': i, 'count': 0}
-                        else:
-                            item_count[item]['i'] = i
-                            item_count[item]['count'] += 1
-                            count = item_count[item]['count']
-
-                            line[i] = line[i]+'_'+str(item_count[item]['count'])
+        parser = _parse_groups(f, encoding=encoding, get_line_numbers=get_line_numbers,
+                               rename_duplicate_headers=rename_duplicate_headers, engine=engine,
+                               only_groups=only_groups, columns=columns, row_filter=row_filter)
 
-                            logger.info(f'Duplicate column {item} found and renamed as {item}_{count}. '
-                                        'Automatically renamed columns do not conform to AGS4 Rules 19a and 19b. '
-                                        'Therefore, please review the data and rename or drop duplicate columns as appropriate.')
+        for group, group_data, group_headings, group_line_numbers in parser:
+            data[group] = group_data
+            line_numbers[group] = group_line_numbers
 
-                # Store HEADING line number
-                line_numbers[group]['HEADING'] = i
+            # Groups without a HEADING row do not have an entry in the headings dict
+            if group_headings is not None:
+                headings[group] = group_headings
 
-                # Store UNIT, TYPE, and DATA line numbers
-                if get_line_numbers is True:
-                    line.append('line_number')
-
-                headings[group] = line
-
-                for item in line:
-                    data[group][item] = []
-
-            elif line[0] in ['TYPE', 'UNIT', 'DATA']:
-
-                # Append line number
-                if get_line_numbers is True:
-                    line.append(i)
-
-                # Check whether line has the same number of entries as the
-                # number of headings in the group. If not, print error and exit.
-                if len(line) != len(headings[group]):
-                    logger.error(f"Line {i} does not have the same number of entries as the HEADING row in {group}.")
-                    raise AGS4Error(f"Line {i} does not have the same number of entries as the HEADING row in {group}.")
-
-                for i in range(0, len(line)):
-                    data[group][headings[group][i]].append(line[i])
-
-            else:
-                continue
     finally:
         if close_file:
             f.close()
@@ -204,7 +136,8 @@ def AGS4_to_dict(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, r
 
 
 def AGS4_to_dataframe(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
-                      only_groups=None):
+                      only_groups=None, engine='stream', columns=None, row_filter=None, index=None,
+                      parallel=False, workers=None, typed=False, categorical=False):
     """Load all the tables in an AGS4 file to a dictionary of Pandas dataframes.
 
     The output is a dictionary of dataframes with the name of each AGS4 table
@@ -214,6 +147,8 @@ def AGS4_to_dataframe(filepath_or_buffer, encoding='utf-8', get_line_numbers=Fal
     ----------
     filepath_or_buffer : str, StringIO
         Path to AGS4 file or any file like object (open file or StringIO).
+        Compressed files ('.gz', '.bz2', '.xz', or a '.zip' archive containing
+        a single AGS4 file) are decompressed while they are read.
     encoding : str, default='utf-8'
         Encoding of text file. This can be set to 'utf-8-sig' to read files that
         begin with a byte-order-mark.
@@ -226,7 +161,53 @@ def AGS4_to_dataframe(filepath_or_buffer, encoding='utf-8', get_line_numbers=Fal
         to duplicates to make them unique.
     only_groups : list or None (default=None)
         An optional list of groups to convert instead of converting all the
-        groups in the input file.
+        groups in the input file. Lines in other groups are skipped without
+        being parsed. Groups that are not in the input file are ignored.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use. See 'AGS4_to_dict()' for details.
+    columns : dict of lists or None (default=None)
+        An optional dictionary with the headings to load from each group (e.g.
+        {'SAMP': ['LOCA_ID', 'SAMP_TOP', 'SAMP_REF']}). The HEADING column is
+        always loaded and all the columns are loaded from groups that are not
+        in the dictionary.
+    row_filter : dict or callable or None (default=None)
+        An optional filter to select the DATA rows to load. If a dictionary
+        is provided (e.g. {'LOCA_ID': {'BH01', 'BH02'}}), then only DATA rows
+        with values in the specified sets are loaded from groups with those
+        headings. If a callable is provided, it is called with the group name
+        and a dictionary of the DATA row (headings as keys) and should return
+        True for the rows to load. UNIT and TYPE rows are always loaded.
+    index : dict or bool or None (default=None)
+        An optional group index created by 'index_groups()', or True to create
+        one. If provided, the groups are read directly from their byte ranges
+        in the file instead of scanning the whole file. Ignored if a file like
+        object is provided.
+    parallel : bool, default=False
+        Parse the file in a pool of worker processes. The file is split into
+        sections at GROUP boundaries (and at row boundaries within groups that
+        are larger than the size of a section) using 'index_groups()', and the
+        sections are parsed concurrently. The output (including the errors
+        raised for invalid files) is identical to that of the serial parser,
+        as files with rows that are not in a group are parsed serially. A
+        row_filter function has to be defined at the top level of a module so
+        that it can be sent to the worker processes.
+        Ignored if a file like object or a compressed file is provided.
+    workers : int or None (default=None)
+        Number of worker processes to use if parallel=True. Defaults to the
+        number of processors on the machine.
+    typed : bool, default=False
+        Convert the data to numeric, datetime, timedelta, and boolean columns
+        based on the TYPE row of each group while the dataframes are created.
+        Numeric (DP, SF, SCI, MC, U) columns are converted to floats, DT
+        columns to datetimes, T columns to timedeltas, and YN columns to
+        booleans. Values that cannot be converted are kept as text. The UNIT
+        and TYPE rows are removed from the tables and stored as dictionaries
+        in the 'UNIT' and 'TYPE' items of the 'attrs' of each dataframe.
+    categorical : bool, default=False
+        Intern the values in the HEADING column and in columns with ID, PA,
+        and PU TYPEs while the file is parsed, and convert these columns to
+        Pandas Categoricals if less than half of their values are unique.
+        This significantly reduces the memory used by large tables.
 
     Returns
     -------
@@ -244,38 +225,592 @@ def AGS4_to_dataframe(filepath_or_buffer, encoding='utf-8', get_line_numbers=Fal
 
     """
 
-    from pandas import DataFrame
+    # Load groups one at a time so that the dictionary of lists holding the
+    # data for a group can be released as soon as its dataframe is created
+    tables = {}
+    headings = {}
+    line_numbers = {}
 
-    # Extract AGS4 file into a dictionary of dictionaries. A dictionary with
-    # group line numbers is returned, in addition to data and headings, for
-    # checking purposes.
-    if get_line_numbers is True:
-        data, headings, line_numbers = AGS4_to_dict(filepath_or_buffer, encoding=encoding, get_line_numbers=get_line_numbers,
-                                                    rename_duplicate_headers=rename_duplicate_headers)
+    if parallel and not _is_file_like(filepath_or_buffer) and _get_compression(filepath_or_buffer) is None:
+        groups = _parse_groups_in_parallel(filepath_or_buffer, encoding=encoding, get_line_numbers=get_line_numbers,
+                                           rename_duplicate_headers=rename_duplicate_headers,
+                                           only_groups=only_groups, engine=engine, columns=columns,
+                                           row_filter=row_filter, index=index, workers=workers, typed=typed,
+                                           categorical=categorical)
+
+    else:
+        groups = iter_groups(filepath_or_buffer, encoding=encoding, get_line_numbers=get_line_numbers,
+                             rename_duplicate_headers=rename_duplicate_headers, only_groups=only_groups,
+                             engine=engine, columns=columns, row_filter=row_filter, index=index, typed=typed,
+                             categorical=categorical)
+
+    for group, group_headings, df, group_line_numbers in groups:
+        tables[group] = df
+        line_numbers[group] = group_line_numbers
+
+        # Groups without a HEADING row do not have an entry in the headings dict
+        if group_headings:
+            headings[group] = group_headings
 
-        # Convert dictionary of dictionaries to a dictionary of Pandas
-        # dataframes
-        tables = {}
-        for key in data:
-            tables[key] = DataFrame(data[key])
+    # Return tables in the order in which they were requested
+    if only_groups:
+        tables = {key: tables[key] for key in only_groups if key in tables}
 
+    # A dictionary with group line numbers is returned, in addition to tables
+    # and headings, for checking purposes.
+    if get_line_numbers is True:
         return tables, headings, line_numbers
 
-    # Otherwise only the data and the headings are returned
-    data, headings = AGS4_to_dict(filepath_or_buffer, encoding=encoding,
-                                  rename_duplicate_headers=rename_duplicate_headers)
+    return tables, headings
+
+
+def read_many(filepaths, workers=None, only_groups=None, concat=False, encoding='utf-8',
+              rename_duplicate_headers=True, engine='stream', columns=None, row_filter=None):
+    """Load the tables in multiple AGS4 files using a pool of worker processes.
+
+    Files are parsed concurrently with 'AGS4_to_dataframe()'. Files that
+    cannot be read (e.g. files that raise an AGS4Error, missing files, or
+    files with the wrong encoding) are skipped and the errors are returned
+    instead of aborting the whole batch.
+
+    Parameters
+    ----------
+    filepaths : list of str or pathlib.Path
+        Paths to AGS4 files
+    workers : int or None (default=None)
+        Number of worker processes. Defaults to the number of processors on
+        the machine. Files are read in the current process if workers=1.
+    only_groups : list or None (default=None)
+        An optional list of groups to load instead of all the groups in the
+        input files. Groups that are not in a file are ignored.
+    concat : bool, default=False
+        Concatenate the tables of the same group from all files into a single
+        dataframe. A categorical 'source_file' column is added to identify the
+        file that each row (including the UNIT and TYPE rows) came from.
+    encoding : str, default='utf-8'
+        Encoding of text files.
+    rename_duplicate_headers: bool, default=True
+        Rename duplicate headers if found.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use. See 'AGS4_to_dict()' for details.
+    columns : dict of lists or None (default=None)
+        An optional dictionary with the headings to load from each group. See
+        'AGS4_to_dataframe()' for details.
+    row_filter : dict or callable or None (default=None)
+        An optional filter to select the DATA rows to load. See
+        'AGS4_to_dataframe()' for details. A row_filter function has to be
+        defined at the top level of a module so that it can be sent to the
+        worker processes.
+
+    Returns
+    -------
+    tables : dict
+        Dictionary with file paths as keys and dictionaries of dataframes as
+        values. If concat=True, it is a dictionary of dataframes with group
+        names as keys instead.
+    headings : dict
+        Dictionary with file paths as keys and dictionaries of headings as
+        values. If concat=True, it is a dictionary with the headings of each
+        group in all files (including 'source_file') instead.
+    errors : dict
+        Dictionary with the paths of the files that could not be read as keys
+        and the exceptions raised as values.
+    """
+
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    kwargs = {'encoding': encoding, 'rename_duplicate_headers': rename_duplicate_headers,
+              'only_groups': only_groups, 'engine': engine, 'columns': columns, 'row_filter': row_filter}
 
-    # Convert dictionary of dictionaries to a dictionary of Pandas dataframes
     tables = {}
+    headings = {}
+    errors = {}
+
+    def collect(filepath, read):
+        try:
+            tables[filepath], headings[filepath] = read()
+
+        except Exception as err:
+            logger.error(f'Could not read {filepath}: {err}')
+            errors[filepath] = err
+
+    if workers == 1:
+        for filepath in filepaths:
+            collect(filepath, lambda: AGS4_to_dataframe(filepath, **kwargs))
 
-    if only_groups:
-        for key in only_groups:
-            tables[key] = DataFrame(data[key])
     else:
-        for key in data:
-            tables[key] = DataFrame(data[key])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(filepath, executor.submit(AGS4_to_dataframe, filepath, **kwargs)) for filepath in filepaths]
 
-    return tables, headings
+            for filepath, future in futures:
+                collect(filepath, future.result)
+
+    if concat is False:
+        return tables, headings, errors
+
+    from pandas import Categorical, concat as concat_dataframes
+
+    source_files = [str(filepath) for filepath in tables]
+
+    concatenated_tables = {}
+    concatenated_headings = {}
+
+    for filepath, file_tables in tables.items():
+        for group, df in file_tables.items():
+            df['source_file'] = str(filepath)
+            concatenated_tables.setdefault(group, []).append(df)
+
+            group_headings = concatenated_headings.setdefault(group, [])
+            group_headings += [x for x in headings[filepath].get(group, df.columns) if x not in group_headings]
+
+    for group, dfs in concatenated_tables.items():
+        df = concat_dataframes(dfs, ignore_index=True)
+        df['source_file'] = Categorical(df['source_file'], categories=source_files)
+
+        concatenated_tables[group] = df
+
+        # Move 'source_file' to the end of the headings
+        concatenated_headings[group] = [x for x in concatenated_headings[group] if x != 'source_file'] + ['source_file']
+
+    return concatenated_tables, concatenated_headings, errors
+
+
+def iter_groups(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
+                only_groups=None, engine='stream', chunksize=None, columns=None, row_filter=None, index=None,
+                typed=False, categorical=False):
+    """Iterate over the tables in an AGS4 file one GROUP at a time.
+
+    Each group is converted to a Pandas dataframe as soon as it has been parsed
+    and the intermediate data is released before the next group is read.
+    Therefore, the peak memory usage is governed by the largest group in the
+    file rather than the size of the whole file.
+
+    Parameters
+    ----------
+    filepath_or_buffer : File path (str, pathlib.Path), or StringIO.
+        Path to AGS4 file or any object with a read() method (such as an open
+        file or StringIO).
+        Compressed files ('.gz', '.bz2', '.xz', or a '.zip' archive containing
+        a single AGS4 file) are decompressed while they are read.
+    encoding : str, default='utf-8'
+        Encoding of text file. This can be set to 'utf-8-sig' to read files that
+        begin with a byte-order-mark.
+    get_line_numbers : bool, default=False
+        Add line number column to each table (for UNIT, TYPE, and DATA rows).
+    rename_duplicate_headers: bool, default=True
+        Rename duplicate headers if found. Neither AGS4 tables nor Pandas
+        dataframes allow duplicate headers, therefore a number will be appended
+        to duplicates to make them unique.
+    only_groups : list or None (default=None)
+        An optional list of groups to read instead of all the groups in the
+        input file. Lines in other groups are skipped without being parsed.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use. See 'AGS4_to_dict()' for details.
+    chunksize : int or None (default=None)
+        Maximum number of DATA rows in each dataframe. Groups with more DATA
+        rows are yielded in consecutive chunks, each of which starts with the
+        UNIT and TYPE rows of the group. This allows groups that are larger
+        than the available memory to be processed.
+    columns : dict of lists or None (default=None)
+        An optional dictionary with the headings to read from each group (e.g.
+        {'SAMP': ['LOCA_ID', 'SAMP_TOP', 'SAMP_REF']}). The HEADING column is
+        always read and all the columns are read from groups that are not in
+        the dictionary.
+    row_filter : dict or callable or None (default=None)
+        An optional filter to select the DATA rows to read. If a dictionary
+        is provided (e.g. {'LOCA_ID': {'BH01', 'BH02'}}), then only DATA rows
+        with values in the specified sets are read from groups with those
+        headings. If a callable is provided, it is called with the group name
+        and a dictionary of the DATA row (headings as keys) and should return
+        True for the rows to read. UNIT and TYPE rows are always read.
+    index : dict or bool or None (default=None)
+        An optional group index created by 'index_groups()', or True to create
+        one. If provided, each group is read by seeking directly to its byte
+        range in the file, so the lines in other groups are not read at all.
+        Ignored if a file like object is provided.
+    typed : bool, default=False
+        Convert the data based on the TYPE row of each group. See
+        'AGS4_to_dataframe()' for details.
+    categorical : bool, default=False
+        Store repetitive columns as Pandas Categoricals. See
+        'AGS4_to_dataframe()' for details.
+
+    Yields
+    ------
+    group : str
+        Name of GROUP
+    headings : list
+        Headings in the GROUP (empty list if the HEADING row is missing)
+    table : Pandas DataFrame
+        Data in the GROUP
+    line_numbers : dict of int
+        Dictionary with the line numbers of the GROUP and HEADING rows.
+    """
+
+    if engine not in _PARSER_ENGINES:
+        raise ValueError(f"Invalid engine '{engine}'. Should be one of {', '.join(_PARSER_ENGINES)}.")
+
+    if chunksize is not None and chunksize < 1:
+        raise ValueError('chunksize should be a positive integer.')
+
+    if not (index is None or isinstance(index, (bool, dict))):
+        raise TypeError(f"index should be a dictionary created by 'index_groups()' or True, not {type(index).__name__}.")
+
+    if index is True and not _is_file_like(filepath_or_buffer):
+        index = index_groups(filepath_or_buffer, encoding=encoding)
+
+    if index and not _is_file_like(filepath_or_buffer):
+        # Read the selected groups from their byte ranges in the file
+        sections = ((_read_group_section(filepath_or_buffer, index[group], encoding),
+                     index[group]['line_numbers']['GROUP'])
+                    for group in index if not only_groups or group in only_groups)
+
+    else:
+        sections = [(filepath_or_buffer, 1)]
+
+    for section, start in sections:
+        f, close_file = _open_file(section, encoding)
+
+        try:
+            parser = _parse_groups(f, encoding=encoding, get_line_numbers=get_line_numbers,
+                                   rename_duplicate_headers=rename_duplicate_headers, engine=engine,
+                                   chunksize=chunksize, only_groups=only_groups, columns=columns,
+                                   row_filter=row_filter, start=start,
+                                   intern_types=_CATEGORICAL_TYPES if categorical else None, row_major=True)
+
+            for group, group_data, group_headings, group_line_numbers in parser:
+                df = _group_dataframe(group_data, group_headings, typed=typed)
+
+                if categorical:
+                    _convert_to_categorical(df)
+
+                # Release lists before parsing the next group
+                del group_data
+
+                yield group, group_headings or [], df, group_line_numbers
+
+        finally:
+            if close_file:
+                f.close()
+
+
+async def aiter_groups(filepath_or_buffer, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
+                       only_groups=None, engine='stream', chunksize=None, columns=None, row_filter=None, index=None,
+                       typed=False, categorical=False, executor=None, semaphore=None):
+    """Asynchronously iterate over the tables in an AGS4 file one GROUP at a
+    time.
+
+    This is an asyncio variant of 'iter_groups()'. Each group is parsed in an
+    executor so that the event loop is not blocked while the file is read.
+
+    Parameters
+    ----------
+    filepath_or_buffer : File path (str, pathlib.Path), StringIO, or async stream.
+        Path to AGS4 file, any object with a read() method (such as an open
+        file or StringIO), or an async byte stream (i.e. an async iterable of
+        bytes or an object with an async read() method, such as an uploaded
+        file). Async streams are copied to a temporary file before they are
+        parsed.
+    executor : concurrent.futures.Executor or None (default=None)
+        Executor in which the file is parsed. The default executor of the
+        event loop is used if None. This should be a thread pool as the parser
+        cannot be sent to another process.
+    semaphore : asyncio.Semaphore or None (default=None)
+        Semaphore that is held while the file is read. A semaphore shared
+        between calls can be used to limit the number of files that are read
+        concurrently.
+
+    All other parameters are the same as in 'iter_groups()'.
+
+    Yields
+    ------
+    group : str
+        Name of GROUP
+    headings : list
+        Headings in the GROUP (empty list if the HEADING row is missing)
+    table : Pandas DataFrame
+        Data in the GROUP
+    line_numbers : dict of int
+        Dictionary with the line numbers of the GROUP and HEADING rows.
+    """
+
+    import asyncio
+    from contextlib import AsyncExitStack
+
+    loop = asyncio.get_running_loop()
+    end = object()
+
+    async with AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+
+        if _is_async_stream(filepath_or_buffer):
+            filepath_or_buffer = await _spool_async_stream(filepath_or_buffer, encoding)
+            stack.callback(filepath_or_buffer.close)
+
+        groups = iter_groups(filepath_or_buffer, encoding=encoding, get_line_numbers=get_line_numbers,
+                             rename_duplicate_headers=rename_duplicate_headers, only_groups=only_groups,
+                             engine=engine, chunksize=chunksize, columns=columns, row_filter=row_filter,
+                             index=index, typed=typed, categorical=categorical)
+
+        pending = None
+
+        async def close_groups():
+            # The generator cannot be closed while it is running in the
+            # executor (e.g. if this task is cancelled while a group is
+            # parsed), so wait for the pending group first
+            if pending is not None:
+                if not pending.done():
+                    await asyncio.wait([pending])
+
+                # Retrieve the exception (if any) of a group that finished
+                # after the task was cancelled
+                if not pending.cancelled():
+                    pending.exception()
+
+            groups.close()
+
+        stack.push_async_callback(close_groups)
+
+        while True:
+            # Shielded so that a cancelled task still waits for the group
+            pending = loop.run_in_executor(executor, next, groups, end)
+            item = await asyncio.shield(pending)
+
+            if item is end:
+                break
+
+            yield item
+
+
+def index_groups(filepath, encoding='utf-8', sidecar=False):
+    """Create an index of the GROUPs in an AGS4 file for random access.
+
+    The file is scanned once in binary mode and the byte offsets and line
+    numbers of the rows in each GROUP are recorded without parsing the DATA
+    rows. The index can be passed to 'iter_groups()' or 'AGS4_to_dataframe()'
+    to read individual groups without scanning the whole file.
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        Path to AGS4 file
+    encoding : str, default='utf-8'
+        Encoding of text file. This is only used to decode group names.
+    sidecar : bool, default=False
+        Save the index to a sidecar file next to the AGS4 file (i.e.
+        'filepath' + '.index.json') and load it from there on subsequent
+        calls, as long as the size and modification time of the AGS4 file
+        have not changed.
+
+    Returns
+    -------
+    index : dict of dicts
+        Dictionary with group names as keys. Each entry has the following
+        items:
+
+        - 'line_numbers': Dictionary with the line numbers of the GROUP row,
+          the last HEADING row, and the first UNIT, TYPE and DATA rows of the
+          group (rows that are missing are not included) and of the first
+          line after the group ('end').
+        - 'offsets': Dictionary with the byte offsets of the same rows.
+        - 'data_rows': Number of DATA rows in the group.
+
+    Raises
+    ------
+    AGS4Error
+        If a group is duplicated or a HEADING, UNIT, TYPE, or DATA row is not
+        in a group (e.g. a DATA row after a blank line), as these rows cannot
+        be read using the index.
+    """
+
+    import json
+    import os
+
+    if _get_compression(filepath) is not None:
+        raise ValueError('Compressed files cannot be indexed. Please decompress the file first.')
+
+    if sidecar:
+        sidecar_path = f'{filepath}.index.json'
+        stat = os.stat(filepath)
+        stamp = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'encoding': encoding}
+
+        try:
+            with open(sidecar_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+
+            if saved.get('stamp') == stamp:
+                return saved['groups']
+
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index, error = _scan_groups(filepath, encoding)
+
+    if error is not None:
+        logger.error(error)
+        raise AGS4Error(error)
+
+    if sidecar:
+        try:
+            with open(sidecar_path, 'w', encoding='utf-8') as f:
+                json.dump({'stamp': stamp, 'groups': index}, f)
+
+        except OSError as err:
+            logger.warning(f'Could not save group index to {sidecar_path} ({err}).')
+
+    return index
+
+
+class AGS4File(Mapping):
+    """Read-only mapping of the tables in an AGS4 file that are loaded on demand.
+
+    The file is indexed with 'index_groups()' when the object is created and
+    only the GROUP and HEADING rows are parsed, so that the headings and line
+    numbers of all the groups are available up front. Each table is parsed
+    into a Pandas dataframe the first time it is accessed and then cached.
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        Path to AGS4 file
+    encoding : str, default='utf-8'
+        Encoding of text file.
+    get_line_numbers : bool, default=False
+        Add line number column to each table (for UNIT, TYPE, and DATA rows).
+    rename_duplicate_headers: bool, default=True
+        Rename duplicate headers if found.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use. See 'AGS4_to_dict()' for details.
+    max_groups : int or None (default=None)
+        Maximum number of tables to keep in the cache. The least recently
+        used table is dropped when the limit is exceeded and it will be parsed
+        again if it is accessed later. All tables are kept if None.
+    sidecar : bool, default=False
+        Save/load the group index to/from a sidecar file. See
+        'index_groups()' for details.
+
+    Attributes
+    ----------
+    headings : dict of lists
+        Dictionary with the headings in each GROUP
+    line_numbers : dict of dicts
+        Dictionary with the line numbers of the GROUP and HEADING rows
+    index : dict of dicts
+        Group index created by 'index_groups()'
+
+    Examples
+    --------
+    >>> ags_file = AGS4File('path/to/file.ags', max_groups=4)
+    >>> LOCA = ags_file['LOCA']
+    """
+
+    def __init__(self, filepath, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
+                 engine='stream', max_groups=None, sidecar=False):
+
+        import os
+        from collections import OrderedDict
+        from io import StringIO
+
+        if engine not in _PARSER_ENGINES:
+            raise ValueError(f"Invalid engine '{engine}'. Should be one of {', '.join(_PARSER_ENGINES)}.")
+
+        if max_groups is not None and max_groups < 1:
+            raise ValueError('max_groups should be a positive integer.')
+
+        self.filepath = filepath
+        self.encoding = encoding
+        self.get_line_numbers = get_line_numbers
+        self.rename_duplicate_headers = rename_duplicate_headers
+        self.engine = engine
+        self.max_groups = max_groups
+
+        # Size and modification time of the file when it was indexed
+        stat = os.stat(filepath)
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+
+        self.index = index_groups(filepath, encoding=encoding, sidecar=sidecar)
+        self.headings = {}
+        self.line_numbers = {}
+
+        self._tables = OrderedDict()
+
+        # Parse only the GROUP and HEADING row of each group
+        with open(filepath, 'rb') as f:
+            for group, entry in self.index.items():
+                self.line_numbers[group] = {'GROUP': entry['line_numbers']['GROUP'],
+                                            'HEADING': entry['line_numbers'].get('HEADING', '-')}
+
+                if 'HEADING' not in entry['offsets']:
+                    continue
+
+                f.seek(entry['offsets']['GROUP'])
+                lines = _read_binary_line(f)
+                f.seek(entry['offsets']['HEADING'])
+                lines += _read_binary_line(f)
+
+                parser = _parse_groups(StringIO(lines.decode(encoding, errors='replace'), newline=None),
+                                       encoding=encoding, get_line_numbers=get_line_numbers,
+                                       rename_duplicate_headers=rename_duplicate_headers,
+                                       start=entry['line_numbers']['GROUP'])
+
+                for _, _, group_headings, _ in parser:
+                    self.headings[group] = group_headings
+
+    def __getitem__(self, group):
+        import os
+
+        if group not in self.index:
+            raise KeyError(group)
+
+        if group in self._tables:
+            self._tables.move_to_end(group)
+
+            return self._tables[group]
+
+        # The byte ranges in the index are only valid for the file as it was
+        # when it was indexed
+        stat = os.stat(self.filepath)
+
+        if (stat.st_size, stat.st_mtime_ns) != self._stamp:
+            raise AGS4Error(f'{self.filepath} has been modified since it was indexed. '
+                            'Please create a new AGS4File object to read it.')
+
+        df = None
+
+        # Read the group from its byte range in the file
+        for _, _, df, _ in iter_groups(self.filepath, encoding=self.encoding, get_line_numbers=self.get_line_numbers,
+                                       rename_duplicate_headers=self.rename_duplicate_headers,
+                                       only_groups=[group], engine=self.engine, index=self.index):
+            self._tables[group] = df
+
+        if df is None:
+            raise KeyError(group)
+
+        # Drop least recently used tables
+        if self.max_groups is not None:
+            while len(self._tables) > self.max_groups:
+                self._tables.popitem(last=False)
+
+        return df
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return f"AGS4File('{self.filepath}', groups={list(self.index)})"
+
+    def clear_cache(self):
+        """Drop all the cached tables."""
+
+        self._tables.clear()
 
 
 def AGS4_to_excel(input_file, output_file, encoding='utf-8', rename_duplicate_headers=True, sorting_strategy=None):
@@ -354,7 +889,8 @@ def AGS4_to_excel(input_file, output_file, encoding='utf-8', rename_duplicate_he
 
 # Write functions #
 
-def dataframe_to_AGS4(tables, headings, filepath, mode='w', index=False, encoding='utf-8', warnings=True):
+def dataframe_to_AGS4(tables, headings, filepath, mode='w', index=False, encoding='utf-8', warnings=True,
+                      compression='infer'):
     """Write a dictionary of Pandas dataframes that have been extracted using
     'AGS4_to_dataframe()' function back to an AGS4 file.
 
@@ -378,6 +914,10 @@ def dataframe_to_AGS4(tables, headings, filepath, mode='w', index=False, encodin
         Encoding of output file
     warnings : bool, default=False
         Print warnings
+    compression : {'infer', 'gzip', 'bz2', 'xz', 'zip', None}, default='infer'
+        Compress the output file. By default, the compression is inferred from
+        the extension of 'filepath' (i.e. '.gz', '.bz2', '.xz', or '.zip').
+        Data cannot be appended to zip archives.
 
     Returns
     -------
@@ -385,7 +925,7 @@ def dataframe_to_AGS4(tables, headings, filepath, mode='w', index=False, encodin
     """
 
     # Open file and write/append data
-    with open(filepath, mode, newline='', encoding=encoding) as f:
+    with _open_output_file(filepath, mode, encoding, compression) as f:
         for key in tables:
             # First make copy of table to avoid unexpected side-effects
             df = tables[key].copy()
@@ -598,8 +1138,8 @@ def convert_to_text(dataframe, dictionary=None):
             # TRAN_AGS in the TRAN table.
             dictionary = check.pick_standard_dictionary(dict_version=dictionary)
 
-        temp, _ = AGS4_to_dataframe(dictionary)
-        DICT = temp['DICT']
+        temp = check.dictionary_cache.load(dictionary)
+        DICT = check.DictionaryIndex(temp['DICT'])
 
         # Check whether UNIT and TYPE rows are already in dataframe
         is_UNIT_row_present = 'UNIT' in df.HEADING.values
@@ -626,8 +1166,8 @@ def convert_to_text(dataframe, dictionary=None):
 
                 try:
                     # Get type and unit from dictionary
-                    TYPE = DICT.loc[DICT.DICT_HDNG == col, 'DICT_DTYP'].iloc[0]
-                    UNIT = DICT.loc[DICT.DICT_HDNG == col, 'DICT_UNIT'].iloc[0]
+                    TYPE = DICT.types[col]
+                    UNIT = DICT.units[col]
 
                     if is_UNIT_row_present:
                         # Overwrite existing UNIT with one from the dictionary
@@ -645,7 +1185,7 @@ def convert_to_text(dataframe, dictionary=None):
 
                     df = format_numeric_column(df, col, TYPE)
 
-                except IndexError:
+                except KeyError:
                     logger.warning(f'{col} not found in the dictionary file.')
 
     return df.sort_index().reset_index(drop=True)
@@ -739,6 +1279,11 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
     filepath_or_buffer : strFile path (str, pathlib.Path), or StringIO.
         Path to AGS4 file or any object with a read() method (such as an open
         file or StringIO) to be checked.
+        Compressed files ('.gz', '.bz2', '.xz', or a '.zip' archive containing
+        a single AGS4 file) are decompressed while they are read. The file is
+        only read once, so streams that are not seekable (e.g. HTTP request
+        bodies) can be checked as well. Binary streams are decoded using
+        'encoding'.
     standard_AGS4_dict : str
         Path to .ags file with standard AGS4 dictionary or version number
         (should be one of '4.2', '4.1.1', '4.1', '4.0.4', '4.0.3', '4.0').
@@ -760,46 +1305,40 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
 
     ags_errors = {}
 
-    # Line checks
-    if _is_file_like(filepath_or_buffer):
-        f = filepath_or_buffer
-        f.seek(0)
-        if hasattr(f, 'encoding') and getattr(f, 'encoding', None) != encoding and hasattr(f, 'reconfigure'):
-            f.reconfigure(encoding=encoding)
-        close_file = False
-    else:
-        f = open(filepath_or_buffer, "r", newline='', encoding=encoding, errors="replace")
-        close_file = True
-
-    try:
-        # Preflight check for AGS3 files and to calculate SHA256 hash of file
-        sha256_hash = hashlib.sha256()
-
-        for i, line in enumerate(f, start=1):
-            ags_errors = check.is_ags3_like(line, i, ags_errors=ags_errors)
-
-            # Exit if ags3_like line is found
-            if ('AGS Format Rule 3' in ags_errors) and ('AGS3' in ags_errors['AGS Format Rule 3'][0]['desc']):
-                ags_errors = check.add_error_msg(ags_errors, 'Validator Process Error', '-', '',
-                                                 'Validation terminated due to suspected AGS3 file. Please fix errors and try again.')
-                return ags_errors
+    # The file is read only once. Each line is passed through the preflight
+    # check, the line checks and then on to the parser that loads the tables.
+    f, close_file = _open_file(filepath_or_buffer, encoding, newline='')
 
-            # Perform SHA256 checksum calculation
-            sha256_hash.update(line.encode(encoding))
+    # Errors from line checks are kept separately until it is confirmed that the
+    # input is not an AGS3 file
+    line_errors = {}
+    sha256_hash = hashlib.sha256()
+    ags3_like = False
 
-        # Reset file stream to the beginning to start AGS4 checks
-        f.seek(0)
+    def check_lines():
+        nonlocal ags3_like
 
         # Initiate group name and headings list
         group = ''
         headings = []
 
-        logger.info('Checking lines...')
-
         for i, line in enumerate(f, start=1):
+            # Preflight check for AGS3 files
+            check.is_ags3_like(line, i, ags_errors=ags_errors)
+
+            # Stop reading file if ags3_like line is found
+            if 'AGS Format Rule 3' in ags_errors:
+                ags3_like = True
+                return
+
+            # Perform SHA256 checksum calculation
+            sha256_hash.update(line.encode(encoding))
+
+            # Split line only once and pass the fields on to all the line checks
+            fields = check.split_line(line)
 
             # Track headings to be used with group checks
-            if line.strip('"').startswith("GROUP"):
+            if fields[0].startswith("GROUP"):
                 # Reset group name and headings list at the beginning each group
                 group = ''
                 headings = []
@@ -811,22 +1350,34 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
                     # GROUP name not available (Rule 19 should catch this error)
                     pass
 
-            elif line.strip('"').startswith("HEADING"):
-                headings = line.rstrip().split('","')
-                headings = [item.strip('"') for item in headings]
+            elif fields[0].startswith("HEADING"):
+                headings = fields
 
             # Call line Checks
-            ags_errors = check.rule_1(line, i, ags_errors=ags_errors, encoding=encoding)
-            ags_errors = check.rule_2a(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_3(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_4_1(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_4_2(line, i, group=group, headings=headings, ags_errors=ags_errors)
-            ags_errors = check.rule_5(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_6(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_7_1(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_19(line, i, ags_errors=ags_errors)
-            ags_errors = check.rule_19a(line, i, group=group, ags_errors=ags_errors)
-            ags_errors = check.rule_19b_1(line, i, group=group, ags_errors=ags_errors)
+            check.rule_1(line, i, ags_errors=line_errors, encoding=encoding)
+            check.rule_2a(line, i, ags_errors=line_errors)
+            check.rule_3(line, i, ags_errors=line_errors, fields=fields)
+            check.rule_4_1(line, i, ags_errors=line_errors, fields=fields)
+            check.rule_4_2(line, i, group=group, headings=headings, ags_errors=line_errors, fields=fields)
+            check.rule_5(line, i, ags_errors=line_errors, fields=fields)
+            check.rule_6(line, i, ags_errors=line_errors)
+            check.rule_7_1(line, i, ags_errors=line_errors, fields=fields)
+            check.rule_19(line, i, ags_errors=line_errors, fields=fields)
+            check.rule_19a(line, i, group=group, ags_errors=line_errors, fields=fields)
+            check.rule_19b_1(line, i, group=group, ags_errors=line_errors, fields=fields)
+
+            yield line
+
+    def finish_line_checks():
+        # Lines that have not been read by the parser (e.g. if it raised an
+        # exception) are checked before any other errors are reported
+        for _ in lines:
+            pass
+
+        if ags3_like:
+            return
+
+        ags_errors.update(line_errors)
 
         # Add additional information about how Rule 1 is implemented if infringements are detected
         if 'AGS Format Rule 1' in ags_errors:
@@ -837,13 +1388,41 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
                   "The user can override this default if the file encoding is different but, "\
                   "it is highly recommended that the 'utf-8' encoding be used when creating AGS4 files. "\
                   "(Hint: If not 'utf-8', then the encoding is most likely to be 'windows-1252' aka 'cp1252')"
-            ags_errors = check.add_error_msg(ags_errors, 'General', '', '', msg)
+            check.add_error_msg(ags_errors, 'General', '', '', msg)
 
-        # Import data into Pandas dataframes to run group checks
-        logger.info('Loading tables...')
+    lines = check_lines()
 
-        f.seek(0)
-        tables, headings, line_numbers = AGS4_to_dataframe(f, get_line_numbers=True, rename_duplicate_headers=rename_duplicate_headers)
+    try:
+        logger.info('Checking lines and loading tables...')
+
+        try:
+            # Import data into Pandas dataframes to run group checks
+            tables, headings, line_numbers = {}, {}, {}
+
+            for group, group_data, group_headings, group_line_numbers in _parse_groups(
+                    lines, encoding=encoding, get_line_numbers=True,
+                    rename_duplicate_headers=rename_duplicate_headers, row_major=True):
+                tables[group] = _group_dataframe(group_data, group_headings)
+                line_numbers[group] = group_line_numbers
+
+                # Groups without a HEADING row do not have an entry in the headings dict
+                if group_headings:
+                    headings[group] = group_headings
+
+        except Exception:
+            finish_line_checks()
+
+            if not ags3_like:
+                raise
+
+        else:
+            finish_line_checks()
+
+        # Exit if ags3_like line is found
+        if ags3_like:
+            ags_errors = check.add_error_msg(ags_errors, 'Validator Process Error', '-', '',
+                                             'Validation terminated due to suspected AGS3 file. Please fix errors and try again.')
+            return ags_errors
 
         # Group Checks
         logger.info('Checking headings and groups...')
@@ -872,21 +1451,25 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
             # TRAN_AGS in the TRAN table.
             standard_AGS4_dictionary = check.pick_standard_dictionary(tables=tables, dict_version=standard_AGS4_dictionary)
 
-        # Import standard dictionary file into Pandas dataframes
-        tables_std_dict, _ = AGS4_to_dataframe(standard_AGS4_dictionary)
+        # Import standard dictionary file into Pandas dataframes (parsed only once per process)
+        tables_std_dict = check.dictionary_cache.load(standard_AGS4_dictionary)
 
         # Combine standard dictionary with DICT table in input file to create an extended dictionary
         # This extended dictionary is used to check the file schema
-        dictionary = check.combine_DICT_tables(tables_std_dict, tables)
+        # The definitions in the extended dictionary are indexed once and shared by all schema rules
+        dictionary = check.DictionaryIndex(check.combine_DICT_tables(tables_std_dict, tables))
 
         logger.info('Checking file schema...')
 
         ags_errors = check.rule_7_2(headings, dictionary, line_numbers, ags_errors=ags_errors)
         ags_errors = check.rule_9(headings, dictionary, line_numbers, ags_errors=ags_errors)
-        ags_errors = check.rule_10a(tables, headings, dictionary, line_numbers, ags_errors=ags_errors)
+        # Rows of each group are indexed by their key fields once and shared by rules 10a, 10c, and 11c
+        key_index = check.KeyIndex(tables)
+
+        ags_errors = check.rule_10a(tables, headings, dictionary, line_numbers, ags_errors=ags_errors, key_index=key_index)
         ags_errors = check.rule_10b(tables, headings, dictionary, line_numbers, ags_errors=ags_errors)
-        ags_errors = check.rule_10c(tables, headings, dictionary, line_numbers, ags_errors=ags_errors)
-        ags_errors = check.rule_11(tables, headings, dictionary, ags_errors=ags_errors)
+        ags_errors = check.rule_10c(tables, headings, dictionary, line_numbers, ags_errors=ags_errors, key_index=key_index)
+        ags_errors = check.rule_11(tables, headings, dictionary, ags_errors=ags_errors, key_index=key_index)
         ags_errors = check.rule_16(tables, headings, dictionary, ags_errors=ags_errors)
         ags_errors = check.rule_17(tables, headings, dictionary, ags_errors=ags_errors)
         # Note: rule_18() has to be called after rule_9() as it relies on rule_9() to flag non-standard headings.
@@ -937,20 +1520,70 @@ def check_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplica
     return ags_errors
 
 
-# Helper functions/classes #
+async def acheck_file(filepath_or_buffer, standard_AGS4_dictionary=None, rename_duplicate_headers=True, encoding='utf-8',
+                      executor=None, semaphore=None):
+    """Asynchronously validate AGS4 file against AGS4 rules.
 
-def write_error_report(ags_errors, output_file, show_warnings=False, show_fyi=False):
-    '''Save error report to file.
+    This is an asyncio variant of 'check_file()'. The file is checked in an
+    executor so that the event loop is not blocked.
 
     Parameters
     ----------
-    ags_errors : dict
-        Python dictionary with AGS4 errors. Output from AGS4.check_file().
-    output_file : str
-        Path to output file
-    show_warnings : bool, default=False
-        Include warning messages in error report
-    show_fyi : bool, default=False
+    filepath_or_buffer : File path (str, pathlib.Path), StringIO, or async stream.
+        Path to AGS4 file, any object with a read() method (such as an open
+        file or StringIO), or an async byte stream (i.e. an async iterable of
+        bytes or an object with an async read() method, such as an uploaded
+        file) to be checked. Async streams are copied to a temporary file
+        before they are checked.
+    executor : concurrent.futures.Executor or None (default=None)
+        Executor in which the file is checked. The default executor of the
+        event loop is used if None. A process pool can only be used if a file
+        path is provided.
+    semaphore : asyncio.Semaphore or None (default=None)
+        Semaphore that is held while the file is checked. A semaphore shared
+        between calls can be used to limit the number of files that are
+        checked concurrently.
+
+    All other parameters are the same as in 'check_file()'.
+
+    Returns
+    -------
+    dict
+        Dictionary contains AGS4 error in input file.
+    """
+
+    import asyncio
+    from contextlib import AsyncExitStack
+    from functools import partial
+
+    async with AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+
+        if _is_async_stream(filepath_or_buffer):
+            # Read files with newline='' as in 'check_file()'
+            filepath_or_buffer = await _spool_async_stream(filepath_or_buffer, encoding, newline='')
+            stack.callback(filepath_or_buffer.close)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, partial(check_file, filepath_or_buffer, standard_AGS4_dictionary=standard_AGS4_dictionary,
+                              rename_duplicate_headers=rename_duplicate_headers, encoding=encoding))
+
+
+# Helper functions/classes #
+
+def write_error_report(ags_errors, output_file, show_warnings=False, show_fyi=False):
+    '''Save error report to file.
+
+    Parameters
+    ----------
+    ags_errors : dict
+        Python dictionary with AGS4 errors. Output from AGS4.check_file().
+    output_file : str
+        Path to output file
+    show_warnings : bool, default=False
+        Include warning messages in error report
+    show_fyi : bool, default=False
         Include FYI messages in error report
 
     Returns
@@ -1096,12 +1729,12 @@ def sort_groups(tables, sorting_strategy='dictionary'):
         Dictionary of Pandas dataframes (output from 'AGS4_to_dataframe()')
     """
 
-    from .check import pick_standard_dictionary, combine_DICT_tables
+    from .check import pick_standard_dictionary, combine_DICT_tables, dictionary_cache
 
     # Combine standard dictionary with DICT table in input file to create an extended dictionary
     # This extended dictionary is used to check the table order
     standard_AGS4_dictionary = pick_standard_dictionary(tables=tables)
-    tables_std_dict, _ = AGS4_to_dataframe(standard_AGS4_dictionary)
+    tables_std_dict = dictionary_cache.load(standard_AGS4_dictionary)
     dictionary = combine_DICT_tables(tables_std_dict, tables)
 
     if sorting_strategy == 'dictionary':
@@ -1162,6 +1795,58 @@ def _is_file_like(obj):
     return True
 
 
+def _is_async_stream(obj):
+    """Check if object is an async stream (i.e. an async iterable or an object
+    with an async read() method)
+
+    Returns
+    -------
+    bool
+        Return True if obj is an async stream, otherwise return False
+    """
+
+    import inspect
+
+    return hasattr(obj, '__aiter__') or inspect.iscoroutinefunction(getattr(obj, 'read', None))
+
+
+async def _spool_async_stream(stream, encoding, newline=None):
+    """Copy an async byte stream to a temporary file.
+
+    Returns
+    -------
+    TextIOWrapper
+        Temporary file opened for reading. The file is deleted when it is
+        closed.
+    """
+
+    import tempfile
+
+    f = tempfile.TemporaryFile()
+
+    async def read_chunks():
+        if hasattr(stream, '__aiter__'):
+            async for chunk in stream:
+                yield chunk
+
+        else:
+            while chunk := await stream.read(1 << 16):
+                yield chunk
+
+    try:
+        async for chunk in read_chunks():
+            f.write(chunk.encode(encoding) if isinstance(chunk, str) else chunk)
+
+        f.seek(0)
+
+    except BaseException:
+        f.close()
+        raise
+
+    # Read file with errors="replace" to catch UnicodeDecodeErrors
+    return TextIOWrapper(f, encoding=encoding, errors="replace", newline=newline)
+
+
 def _is_bytebuffer(obj):
     """Check if object is buffer like
 
@@ -1193,6 +1878,1327 @@ def _remove_byte_order_mark(string, encoding):
     return string_without_BOM
 
 
+def _open_file(filepath_or_buffer, encoding, newline=None):
+    """Open AGS4 file for reading or prepare an already open file/stream.
+
+    Returns
+    -------
+    f : file object
+    close_file : bool
+        True if the file was opened by this function and should be closed
+        by the caller
+    """
+
+    if _is_file_like(filepath_or_buffer):
+        import io
+
+        f = filepath_or_buffer
+
+        # Streams that are not seekable (e.g. HTTP request bodies) are read
+        # from their current position
+        if not hasattr(f, 'seekable') or f.seekable():
+            f.seek(0)
+
+        if isinstance(f, (io.RawIOBase, io.BufferedIOBase)):
+            # Decode binary streams with errors="replace" to catch UnicodeDecodeErrors
+            f = _BinaryStreamReader(f, newline=newline, encoding=encoding, errors="replace")
+
+        elif hasattr(f, 'encoding') and getattr(f, 'encoding', None) != encoding and hasattr(f, 'reconfigure'):
+            f.reconfigure(encoding=encoding)
+
+        close_file = False
+    else:
+        # Read file with errors="replace" to catch UnicodeDecodeErrors
+        compression = _get_compression(filepath_or_buffer)
+
+        if compression is None:
+            f = open(filepath_or_buffer, "r", newline=newline, encoding=encoding, errors="replace")
+
+        elif compression == 'zip':
+            import zipfile
+
+            # The member keeps the archive file open after the ZipFile is closed
+            with zipfile.ZipFile(filepath_or_buffer) as archive:
+                member = archive.open(_get_zip_member(archive))
+
+            f = TextIOWrapper(member, newline=newline, encoding=encoding, errors="replace")
+
+        else:
+            import importlib
+
+            module = importlib.import_module(_COMPRESSION_MODULES[compression])
+            f = module.open(filepath_or_buffer, "rt", newline=newline, encoding=encoding, errors="replace")
+
+        close_file = True
+
+    return f, close_file
+
+
+class _BinaryStreamReader(TextIOWrapper):
+    """Text wrapper for binary streams that are provided by the user.
+
+    The binary stream is detached instead of being closed when the wrapper is
+    closed or garbage collected, so that it remains open for the user.
+    """
+
+    def close(self):
+        try:
+            self.detach()
+
+        except ValueError:
+            # Stream has already been detached
+            pass
+
+
+def _get_compression(filepath, compression='infer', check_magic_bytes=True):
+    """Get the compression format of a file from its extension or, if the
+    file exists and 'check_magic_bytes' is True, from its first few bytes.
+
+    Returns
+    -------
+    str or None
+        'gzip', 'bz2', 'xz', 'zip' or None if the file is not compressed
+    """
+
+    import os
+
+    if compression != 'infer':
+        if compression is not None and compression not in _COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Compression '{compression}' is not supported. "
+                             f"Please use one of {list(_COMPRESSION_EXTENSIONS)}.")
+
+        return compression
+
+    extension = os.path.splitext(str(filepath))[1].lower()
+
+    for compression, extensions in _COMPRESSION_EXTENSIONS.items():
+        if extension in extensions:
+            return compression
+
+    if not check_magic_bytes:
+        return None
+
+    try:
+        with open(filepath, 'rb') as f:
+            magic = f.read(6)
+    except OSError:
+        return None
+
+    for compression, magic_bytes in _COMPRESSION_MAGIC_BYTES.items():
+        if magic.startswith(magic_bytes):
+            return compression
+
+    return None
+
+
+def _get_zip_member(archive):
+    """Get the name of the AGS4 file in a zip archive.
+
+    Files in 'FILE/' folders are not considered, as these are attachments to
+    the AGS4 file (see AGS Format Rule 20).
+
+    Returns
+    -------
+    str
+        Name of the AGS4 file in the archive
+    """
+
+    members = [name for name in archive.namelist()
+               if name.lower().endswith('.ags') and 'FILE' not in name.split('/')[:-1]]
+
+    if len(members) != 1:
+        raise AGS4Error(f'Zip archive should contain exactly one AGS4 file but {len(members)} found.')
+
+    return members[0]
+
+
+@contextmanager
+def _open_output_file(filepath, mode, encoding, compression='infer'):
+    """Open AGS4 file for writing, compressing the output if required."""
+
+    compression = _get_compression(filepath, compression, check_magic_bytes=False)
+
+    if compression is None:
+        with open(filepath, mode, newline='', encoding=encoding) as f:
+            yield f
+
+    elif compression == 'zip':
+        import os
+        import zipfile
+
+        if mode != 'w':
+            raise ValueError('Data cannot be appended to a zip archive.')
+
+        # Name the AGS4 file in the archive after the archive itself
+        name = os.path.basename(str(filepath))
+        name = name[:-4] if name.lower().endswith('.zip') else name
+        name = name if name.lower().endswith('.ags') else f'{name}.ags'
+
+        with zipfile.ZipFile(filepath, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            with TextIOWrapper(archive.open(name, 'w', force_zip64=True), newline='', encoding=encoding) as f:
+                yield f
+
+    else:
+        import importlib
+
+        module = importlib.import_module(_COMPRESSION_MODULES[compression])
+
+        with module.open(filepath, f'{mode}t', newline='', encoding=encoding) as f:
+            yield f
+
+
+def _scan_groups(filepath, encoding):
+    """Scan an AGS4 file in binary mode and record the byte offsets and line
+    numbers of the rows in each GROUP (see 'index_groups()').
+
+    The scan stops at the first row that cannot be read using the index, i.e.
+    a duplicate GROUP row, a GROUP row without a group name, or a HEADING,
+    UNIT, TYPE, or DATA row that is not in a group. The parser either raises
+    an exception for these rows or skips them (e.g. if they are not in one of
+    the selected groups), so they cannot be dropped by reading only the byte
+    ranges of the groups.
+
+    Returns
+    -------
+    index : dict of dicts
+        Group index (incomplete if an error is returned)
+    error : str or None
+        Description of the first row that cannot be read using the index, or
+        None if all rows can be read
+    """
+
+    import codecs
+    import csv
+
+    index = {}
+    group = None
+    offset = 0
+    i = 0
+
+    with open(filepath, 'rb') as f:
+        for i, line in enumerate(_iter_binary_lines(f), start=1):
+            if i == 1:
+                line_without_BOM = line.lstrip(codecs.BOM_UTF8)
+                offset += len(line) - len(line_without_BOM)
+                line = line_without_BOM
+
+            descriptor = line.split(b',', 1)[0].strip().strip(b'"')
+
+            if descriptor == b'GROUP' or line in (b'\r\n', b'\n', b'\r'):
+                # A blank line or the next GROUP row indicates the end of the current group
+                # (Lines with only whitespace are not blank, as they are not skipped by the parser)
+                if group is not None:
+                    index[group]['line_numbers']['end'] = i
+                    index[group]['offsets']['end'] = offset
+                    group = None
+
+                if descriptor == b'GROUP':
+                    fields = next(csv.reader([line.decode(encoding, errors='replace')]), [])
+
+                    if len(fields) < 2:
+                        return index, f"GROUP row in Line {i} does not have a group name."
+
+                    group = fields[1]
+
+                    if group in index:
+                        return index, f"{group} group duplicated in Line {i}. Cannot parse file without overwriting "\
+                                      "data, therefore please combine all duplicate groups first."
+
+                    index[group] = {'line_numbers': {'GROUP': i}, 'offsets': {'GROUP': offset}, 'data_rows': 0}
+
+            elif descriptor in (b'HEADING', b'UNIT', b'TYPE', b'DATA'):
+                key = descriptor.decode()
+
+                if group is None:
+                    # Parse the line in the same way as the parser, as rows
+                    # with other descriptors are ignored
+                    fields = next(csv.reader([line.decode(encoding, errors='replace')]), [])
+
+                    if fields and fields[0] == 'HEADING':
+                        return index, f"HEADER row in Line {i} is not associated with a GROUP. Please ensure that "\
+                                      "the GROUP name is defined in the line immediately preceding the HEADER row."
+
+                    if fields and fields[0] == key:
+                        return index, f"{key} row in Line {i} is not associated with a GROUP. Please ensure that "\
+                                      "there are no blank lines between the rows of a group."
+
+                else:
+                    # The parser uses the last HEADING row of a group
+                    if key not in index[group]['line_numbers'] or key == 'HEADING':
+                        index[group]['line_numbers'][key] = i
+                        index[group]['offsets'][key] = offset
+
+                    if key == 'DATA':
+                        index[group]['data_rows'] += 1
+
+            offset += len(line)
+
+    if group is not None:
+        index[group]['line_numbers']['end'] = i + 1
+        index[group]['offsets']['end'] = offset
+
+    return index, None
+
+
+def _read_group_section(filepath, entry, encoding):
+    """Read the lines of one GROUP from an AGS4 file using its index entry.
+
+    Returns
+    -------
+    StringIO
+        Lines from the GROUP row to the end of the group
+    """
+
+    from io import StringIO
+
+    start, end = entry['offsets']['GROUP'], entry['offsets']['end']
+
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        section = f.read(end - start)
+
+    # Translate line endings in the same way as a file opened in text mode
+    return StringIO(section.decode(encoding, errors='replace'), newline=None)
+
+
+def _iter_binary_lines(f):
+    """Iterate over the lines of a file opened in binary mode.
+
+    Lines are split at '\r\n', '\r', and '\n' (the same as a file opened in
+    text mode with universal newlines) so that the line numbers and byte
+    offsets match those of the lines read by the parser.
+
+    Parameters
+    ----------
+    f : file object
+        File opened in binary mode
+
+    Yields
+    ------
+    bytes
+        Line including its line terminator
+    """
+
+    import re
+
+    for line in f:
+        # Lines only have to be split if they contain a '\r' that is not part of a '\r\n' terminator
+        if b'\r' in line and not (line.endswith(b'\r\n') and line.count(b'\r') == 1):
+            yield from re.findall(rb'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+', line)
+
+        else:
+            yield line
+
+
+def _read_binary_line(f):
+    """Read a single line from the current position in a file opened in
+    binary mode (see '_iter_binary_lines()')."""
+
+    position = f.tell()
+    line = next(_iter_binary_lines(f), b'')
+
+    # Set position to the end of the line as the file may have been read further
+    f.seek(position + len(line))
+
+    return line
+
+
+def _parse_groups_in_parallel(filepath, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True,
+                              only_groups=None, engine='stream', columns=None, row_filter=None, index=None,
+                              workers=None, typed=False, categorical=False):
+    """Parse an AGS4 file in sections using a pool of worker processes.
+
+    Consecutive groups are combined into sections of roughly equal size and
+    groups that are larger than a section are split at line boundaries. The
+    GROUP and HEADING rows of a split group are prepended to each of its
+    sections so that the DATA rows can be parsed independently.
+
+    Files with rows that are not in a group (see '_scan_groups()') are parsed
+    serially, so that the same exceptions are raised as by the serial parser.
+
+    Yields
+    ------
+    The same items as 'iter_groups()'
+    """
+
+    import os
+    import re
+    from concurrent.futures import ProcessPoolExecutor
+    from pandas import concat
+
+    if engine not in _PARSER_ENGINES:
+        raise ValueError(f"Invalid engine '{engine}'. Should be one of {', '.join(_PARSER_ENGINES)}.")
+
+    if not (index is None or isinstance(index, (bool, dict))):
+        raise TypeError(f"index should be a dictionary created by 'index_groups()' or True, not {type(index).__name__}.")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if not index:
+        index, error = _scan_groups(filepath, encoding)
+
+        if error is not None:
+            # Rows that are not in a group cannot be assigned to a section, so
+            # parse the file serially to get the same result as the serial parser
+            yield from iter_groups(filepath, encoding=encoding, get_line_numbers=get_line_numbers,
+                                   rename_duplicate_headers=rename_duplicate_headers, only_groups=only_groups,
+                                   engine=engine, columns=columns, row_filter=row_filter, typed=typed,
+                                   categorical=categorical)
+            return
+
+    section_size = max(-(-os.path.getsize(filepath) // workers), _MIN_SECTION_SIZE)
+
+    # List of (start offset, end offset, line number of first line, prefix)
+    sections = []
+
+    with open(filepath, 'rb') as f:
+        for group, entry in index.items():
+            if only_groups and group not in only_groups:
+                continue
+
+            offsets = entry['offsets']
+            start, end = offsets['GROUP'], offsets['end']
+
+            if end - start <= section_size or not offsets.get('HEADING', end) < offsets.get('DATA', -1):
+                # Add group to the previous section if it is not too large
+                if sections and not sections[-1][3] and end - sections[-1][0] <= section_size:
+                    sections[-1][1] = end
+                else:
+                    sections.append([start, end, entry['line_numbers']['GROUP'], b''])
+
+                continue
+
+            # Split large group at line boundaries after the first DATA row
+            f.seek(offsets['GROUP'])
+            prefix = _read_binary_line(f)
+            f.seek(offsets['HEADING'])
+            prefix += _read_binary_line(f)
+
+            line_number = entry['line_numbers']['DATA']
+            position = offsets['DATA']
+            sections.append([start, end, entry['line_numbers']['GROUP'], b''])
+
+            while position + section_size < end:
+                f.seek(position)
+                block = f.read(section_size)
+
+                # Complete the last line in the block (which may end between the '\r' and '\n' of a terminator)
+                if block.endswith(b'\r'):
+                    rest = b'\n' if f.read(1) == b'\n' else b''
+
+                elif block.endswith(b'\n'):
+                    rest = b''
+
+                else:
+                    rest = _read_binary_line(f)
+
+                split = position + len(block) + len(rest)
+
+                if split >= end:
+                    break
+
+                # Count lines from the previous split to the start of the next section
+                line_number += len(re.findall(rb'\r\n|\r|\n', block + rest))
+                sections[-1][1] = split
+                sections.append([split, end, line_number - 2, prefix])
+                position = split
+
+    if not sections:
+        return
+
+    kwargs = {'encoding': encoding, 'get_line_numbers': get_line_numbers,
+              'rename_duplicate_headers': rename_duplicate_headers, 'only_groups': only_groups,
+              'engine': engine, 'columns': columns, 'row_filter': row_filter,
+              'intern_types': _CATEGORICAL_TYPES if categorical else None}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_parse_section, *zip(*[(filepath, *section, kwargs) for section in sections]))
+
+        # Reassemble groups in the order in which they appear in the file
+        # (Groups that were split are concatenated)
+        group, parts = None, []
+
+        def assemble(parts):
+            df = parts[0][2] if len(parts) == 1 else concat([x[2] for x in parts], ignore_index=True)
+
+            # Types are converted after reassembly as only the first section
+            # of a split group has the UNIT and TYPE rows
+            if typed:
+                df = _typed_dataframe({heading: df[heading].to_numpy() for heading in df})
+
+            if categorical:
+                _convert_to_categorical(df)
+
+            return df
+
+        for result in results:
+            for item in result:
+                if parts and item[0] == group and item[3]['GROUP'] != parts[0][3]['GROUP']:
+                    parts.append(item)
+                    continue
+
+                if parts:
+                    yield group, parts[0][1], assemble(parts), parts[0][3]
+
+                group, parts = item[0], [item]
+
+        if parts:
+            yield group, parts[0][1], assemble(parts), parts[0][3]
+
+
+def _group_dataframe(data, headings, typed=False):
+    """Create a dataframe from the rows of a GROUP.
+
+    The rows are converted to a single 2-D object array so that the dataframe
+    can be created without building a list for each column.
+
+    Parameters
+    ----------
+    data : tuple
+        List of rows and array of line numbers (or None) yielded by
+        '_parse_groups()' with row_major=True
+    headings : list or None
+        Headings in the GROUP
+    typed : bool, default=False
+        Convert columns based on the TYPE row (see '_typed_dataframe()')
+
+    Returns
+    -------
+    Pandas DataFrame
+    """
+
+    from numpy import array, empty, int64
+    from pandas import DataFrame
+
+    rows, row_line_numbers = data
+
+    if not headings:
+        return DataFrame()
+
+    items = headings[:-1] if row_line_numbers is not None else headings
+
+    if rows:
+        values = array(rows, dtype=object)
+    else:
+        values = empty((0, len(items)), dtype=object)
+
+    if typed:
+        data = {item: values[:, j] for j, item in enumerate(items)}
+
+        if row_line_numbers is not None:
+            data['line_number'] = array(row_line_numbers, dtype=int64)
+
+        return _typed_dataframe(data)
+
+    df = DataFrame(values, columns=items)
+
+    if row_line_numbers is not None:
+        df['line_number'] = array(row_line_numbers, dtype=int64)
+
+    return df
+
+
+def _typed_dataframe(data):
+    """Create a dataframe with columns converted based on the TYPE row.
+
+    Parameters
+    ----------
+    data : dict of lists or arrays
+        Data in a GROUP with headings as keys (see '_parse_groups()')
+
+    Returns
+    -------
+    Pandas DataFrame
+        Dataframe with the DATA rows of the group. The UNIT and TYPE rows are
+        stored in the 'attrs' of the dataframe.
+    """
+
+    import re
+    import warnings
+    from pandas import DataFrame, Series, to_datetime, to_numeric, to_timedelta
+
+    row_types = list(data.get('HEADING', []))
+
+    # UNIT and TYPE rows are usually the first two rows, so avoid building a
+    # list of DATA row indices if possible
+    data_rows = [j for j, x in enumerate(row_types) if x not in ('UNIT', 'TYPE')]
+    metadata_row_count = len(row_types) - len(data_rows)
+
+    if data_rows == list(range(metadata_row_count, len(row_types))):
+        data_rows = slice(metadata_row_count, None)
+
+    units = dict(zip(data, [values[row_types.index('UNIT')] for values in data.values()])) if 'UNIT' in row_types else {}
+    types = dict(zip(data, [values[row_types.index('TYPE')] for values in data.values()])) if 'TYPE' in row_types else {}
+
+    for item in ('HEADING', 'line_number'):
+        units.pop(item, None)
+        types.pop(item, None)
+
+    def convert(values, converter):
+        # Keep original text where conversion fails (empty strings are treated as missing values)
+        values = Series(values, dtype=object)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            converted = converter(values)
+
+        if converted.dtype == object:
+            return values
+
+        failed = converted.isna() & values.ne('')
+
+        if failed.any():
+            converted = converted.astype(object)
+            converted[failed] = values[failed]
+
+        return converted
+
+    def to_boolean(values):
+        values = values.str.strip().str.upper()
+        return values.map({'Y': True, 'YES': True, 'N': False, 'NO': False}).astype('boolean')
+
+    columns = {}
+
+    for heading, values in data.items():
+        values = values[data_rows] if isinstance(data_rows, slice) else [values[j] for j in data_rows]
+        TYPE = types.get(heading, '')
+
+        if heading == 'line_number':
+            columns[heading] = Series(values, dtype='int64')
+
+        elif re.fullmatch(r'\d*(DP|SF|SCI)|MC|U', TYPE):
+            columns[heading] = convert(values, lambda x: to_numeric(x, errors='coerce'))
+
+        elif TYPE == 'DT':
+            columns[heading] = convert(values, lambda x: to_datetime(x, format='ISO8601', errors='coerce'))
+
+        elif TYPE == 'T':
+            columns[heading] = convert(values, lambda x: to_timedelta(x, errors='coerce'))
+
+        elif TYPE == 'YN':
+            columns[heading] = convert(values, to_boolean)
+
+            # Use numpy booleans if there are no missing values
+            if columns[heading].dtype == 'boolean' and not columns[heading].isna().any():
+                columns[heading] = columns[heading].astype(bool)
+
+        else:
+            columns[heading] = Series(values, dtype=object)
+
+    df = DataFrame(columns)
+    df.attrs['UNIT'] = units
+    df.attrs['TYPE'] = types
+
+    return df
+
+
+def _convert_to_categorical(df):
+    """Convert repetitive columns in a dataframe to Pandas Categoricals.
+
+    The HEADING column and columns with ID, PA, and PU TYPEs are converted if
+    less than half of their values are unique.
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        Dataframe to convert in place. The TYPE row is taken from the 'attrs'
+        of the dataframe if it has been created with typed=True.
+    """
+
+    if 'TYPE' in df.attrs:
+        types = df.attrs['TYPE']
+    elif 'HEADING' in df and df['HEADING'].eq('TYPE').any():
+        types = df.loc[df['HEADING'].eq('TYPE'), :].iloc[0].to_dict()
+    else:
+        types = {}
+
+    for heading in df:
+        if heading != 'HEADING' and types.get(heading) not in _CATEGORICAL_TYPES:
+            continue
+
+        column = df[heading]
+
+        if column.dtype == object and column.nunique() < len(column) / 2:
+            df[heading] = column.astype('category')
+
+
+def _parse_section(filepath, start, end, line_number, prefix, kwargs):
+    """Parse a section of an AGS4 file (see '_parse_groups_in_parallel()').
+
+    Returns
+    -------
+    list
+        The same items as 'iter_groups()' for each group in the section
+    """
+
+    from io import StringIO
+
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        section = prefix + f.read(end - start)
+
+    f = StringIO(section.decode(kwargs['encoding'], errors='replace'), newline=None)
+
+    return [(group, group_headings or [], _group_dataframe(group_data, group_headings), group_line_numbers)
+            for group, group_data, group_headings, group_line_numbers in _parse_groups(f, start=line_number,
+                                                                                       row_major=True, **kwargs)]
+
+
+def _parse_groups(f, encoding='utf-8', get_line_numbers=False, rename_duplicate_headers=True, engine='stream',
+                  chunksize=None, only_groups=None, columns=None, row_filter=None, start=1, intern_types=None,
+                  row_major=False):
+    """Parse an open AGS4 file and yield the data in one GROUP at a time.
+
+    Only the data of the group that is currently being parsed is held in
+    memory. A group is yielded as soon as a blank line, the next GROUP row or
+    the end of the file is reached. The tokenized rows of each group are
+    collected as they are and only transposed to columns (if required) when
+    the group is yielded, instead of appending each field to a list.
+
+    Parameters
+    ----------
+    f : file object
+        Open file or any other iterable of lines (str or bytes)
+    encoding : str, default='utf-8'
+        Encoding of text file.
+    get_line_numbers : bool, default=False
+        Add line number column to each group (for UNIT, TYPE, and DATA rows).
+    rename_duplicate_headers: bool, default=True
+        Rename duplicate headers if found.
+    engine : {'stream', 'line', 'mmap'}, default='stream'
+        Parser engine to use.
+    chunksize : int or None (default=None)
+        Maximum number of DATA rows to yield at a time. The UNIT and TYPE rows
+        of the group are repeated at the start of each chunk.
+    only_groups : list or None (default=None)
+        Groups to parse. The lines in all other groups are skipped by the
+        parser engine without being tokenized.
+    columns : dict of lists or None (default=None)
+        Headings to keep in each group. The HEADING column (and line_number
+        column) is always kept.
+    row_filter : dict or callable or None (default=None)
+        Filter to select the DATA rows to keep (see '_compile_row_filter()').
+    start : int, default=1
+        Line number of the first line in f. This is used when parsing a
+        section of a file (see 'index_groups()').
+    intern_types : collection of str or None (default=None)
+        TYPEs of the columns with values that should be interned. Values in
+        these columns are interned from the TYPE row of each group onwards,
+        while the values in the HEADING column are interned in all rows.
+    row_major : bool, default=False
+        Yield the rows of each group instead of a dictionary of columns (see
+        '_group_dataframe()').
+
+    Yields
+    ------
+    group : str
+        Name of GROUP
+    data : dict of lists, or tuple if row_major=True
+        Data in the GROUP with headings as keys. If row_major=True, a tuple
+        with a list of rows (without line numbers) and an array of line
+        numbers (None if get_line_numbers=False).
+    headings : list or None
+        Headings in the GROUP (None if the HEADING row is missing)
+    line_numbers : dict of int
+        Dictionary with the line numbers of the GROUP and HEADING rows.
+    """
+
+    from array import array
+    from operator import itemgetter
+    from sys import intern
+
+    def new_group_data():
+        # List of rows and array of line numbers
+        return [], array('q') if get_line_numbers is True else None
+
+    def output(key, group_data):
+        if row_major:
+            return group_data
+
+        rows, row_line_numbers = group_data
+
+        if key not in headings:
+            return {}
+
+        # Transpose rows to columns
+        items = headings[key][:-1] if get_line_numbers is True else headings[key]
+
+        if rows:
+            group_data = {item: list(column) for item, column in zip(items, zip(*rows))}
+        else:
+            group_data = {item: [] for item in items}
+
+        if get_line_numbers is True:
+            group_data['line_number'] = row_line_numbers
+
+        return group_data
+
+    headings = {}
+    line_numbers = {}
+
+    # Number of fields in the HEADING row of each group and function to pick
+    # the fields that are kept from each row (None to keep all fields)
+    field_counts = {}
+    field_getters = {}
+
+    # Function to select DATA rows to keep in each group (None to keep all rows)
+    row_filters = {}
+
+    # Indices of the fields (other than the HEADING column) with values that
+    # are interned in each group after its TYPE row
+    interned_fields = {}
+
+    # Data of the group that is currently being parsed
+    data = {}
+
+    # UNIT and TYPE rows of the current group and number of DATA rows in the
+    # current chunk (only tracked if chunksize is specified)
+    metadata_rows = []
+    data_row_count = 0
+
+    # Initialize variable to track current group
+    group = None
+
+    for i, line in _PARSER_ENGINES[engine](f, encoding, only_groups=only_groups, start=start):
+
+        # A blank line or the next GROUP row indicates the end of the current
+        # group, so hand it over to the caller before continuing
+        if data and (len(line) == 0 or line[0] == 'GROUP'):
+            key, group_data = data.popitem()
+
+            if not only_groups or key in only_groups:
+                yield key, output(key, group_data), headings.get(key), line_numbers[key]
+
+            del group_data
+
+        if len(line) == 0:
+            # This indicates a blank line so assume that the current group has ended
+            group = None
+
+            continue
+
+        elif line[0] == 'GROUP':
+            group = line[1]
+
+            # Raise exception if duplicate group is found as previous copy
+            # of that group will be overwritten
+            if group in line_numbers.keys():
+                msg = f"{group} group duplicated in Line {i}. Cannot parse file without overwriting data, "\
+                       "therefore please combine all duplicate groups first."
+
+                logger.error(msg)
+                raise AGS4Error(msg)
+
+            else:
+                data[group] = new_group_data()
+
+            # Store GROUP line number (A default 'HEADING' entry is added to
+            # avoid KeyErrors in case of missing HEADING rows)
+            line_numbers[group] = {'GROUP': i, 'HEADING': '-'}
+
+            metadata_rows = []
+            data_row_count = 0
+
+        elif line[0] == 'HEADING':
+
+            if group is None:
+                msg = f"HEADER row in Line {i} is not associated with a GROUP. "\
+                    "Please ensure that the GROUP name is defined in the line immediately preceding the HEADER row."
+
+                logger.error(msg)
+                raise AGS4Error(msg)
+
+            # Catch HEADER rows with duplicate entries as it will result in
+            # a dictionary with arrays of unequal lengths and cause a
+            # ValueError when trying to convert to a Pandas dataframe
+            if len(line) != len(set(line)):
+
+                if rename_duplicate_headers is False:
+                    raise AGS4Error(f"HEADER row in {group} (Line {i}) has duplicate entries")
+
+                logger.warning(f"HEADER row in {group} (Line {i}) has duplicate entries.")
+
+                # Rename duplicate headers by appending a number
+                item_count = {}
+
+                for i, item in enumerate(line):
+                    if item not in item_count:
+                        item_count[item] = {'i': i, 'count': 0}
+                    else:
+                        item_count[item]['i'] = i
+                        item_count[item]['count'] += 1
+                        count = item_count[item]['count']
+
+                        line[i] = line[i]+'_'+str(item_count[item]['count'])
+
+                        logger.info(f'Duplicate column {item} found and renamed as {item}_{count}. '
+                                    'Automatically renamed columns do not conform to AGS4 Rules 19a and 19b. '
+                                    'Therefore, please review the data and rename or drop duplicate columns as appropriate.')
+
+            # Store HEADING line number
+            line_numbers[group]['HEADING'] = i
+
+            field_counts[group] = len(line)
+
+            if columns and group in columns:
+                # Keep only the requested columns in the order in which they
+                # appear in the HEADING row
+                for item in [x for x in columns[group] if x not in line]:
+                    logger.warning(f"Column {item} not found in the {group} group.")
+
+                indices = [j for j, item in enumerate(line) if item == 'HEADING' or item in columns[group]]
+
+                # itemgetter() returns a tuple of fields unless there is only one index
+                if len(indices) > 1:
+                    field_getters[group] = itemgetter(*indices)
+                else:
+                    field_getters[group] = lambda row, j=indices[0]: (row[j],)
+
+                headings[group] = [line[j] for j in indices]
+
+            else:
+                field_getters[group] = None
+                headings[group] = list(line)
+
+            row_filters[group] = _compile_row_filter(row_filter, group, line)
+
+            # Store UNIT, TYPE, and DATA line numbers in a separate integer
+            # array instead of appending them to each row
+            if get_line_numbers is True:
+                headings[group].append('line_number')
+
+            data[group] = new_group_data()
+
+        elif line[0] in ['TYPE', 'UNIT', 'DATA']:
+
+            # Check whether line has the same number of entries as the
+            # number of headings in the group. If not, print error and exit.
+            if len(line) != field_counts[group]:
+                logger.error(f"Line {i} does not have the same number of entries as the HEADING row in {group}.")
+                raise AGS4Error(f"Line {i} does not have the same number of entries as the HEADING row in {group}.")
+
+            # Drop DATA rows that do not match the row filter
+            if row_filters[group] is not None and line[0] == 'DATA' and not row_filters[group](line):
+                continue
+
+            # Intern repetitive values so that identical strings share memory
+            if intern_types:
+                if line[0] == 'TYPE':
+                    interned_fields[group] = [j for j, item in enumerate(line) if j > 0 and item in intern_types]
+
+                line[0] = intern(line[0])
+
+                for j in interned_fields.get(group, ()):
+                    line[j] = intern(line[j])
+
+            if field_getters[group] is not None:
+                line = field_getters[group](line)
+
+            rows, row_line_numbers = data[group]
+
+            if chunksize is not None:
+                if line[0] != 'DATA':
+                    metadata_rows.append((i, line))
+
+                else:
+                    if data_row_count == chunksize:
+                        # Hand over full chunk and start a new one with the
+                        # UNIT and TYPE rows of the group
+                        yield group, output(group, data.pop(group)), headings[group], line_numbers[group]
+
+                        data[group] = rows, row_line_numbers = new_group_data()
+                        data_row_count = 0
+
+                        for row_line_number, row in metadata_rows:
+                            rows.append(row)
+
+                            if get_line_numbers is True:
+                                row_line_numbers.append(row_line_number)
+
+                    data_row_count += 1
+
+            rows.append(line)
+
+            if get_line_numbers is True:
+                row_line_numbers.append(i)
+
+        else:
+            continue
+
+    # Yield last group in file
+    if data:
+        key, group_data = data.popitem()
+
+        if not only_groups or key in only_groups:
+            yield key, output(key, group_data), headings.get(key), line_numbers[key]
+
+
+def _compile_row_filter(row_filter, group, headings):
+    """Create function to select DATA rows to keep in a group.
+
+    Parameters
+    ----------
+    row_filter : dict or callable or None
+        Dictionary with sets of values to keep for one or more headings (e.g.
+        {'LOCA_ID': {'BH01', 'BH02'}}) or a function that is called with the
+        group name and a dictionary of the row and returns True for rows to
+        keep.
+    group : str
+        Name of GROUP
+    headings : list
+        Headings in the HEADING row of the group
+
+    Returns
+    -------
+    callable or None
+        Function that takes a tokenized row and returns True if it should be
+        kept, or None if all rows in the group should be kept.
+    """
+
+    if row_filter is None:
+        return None
+
+    if callable(row_filter):
+        return lambda row: row_filter(group, dict(zip(headings, row)))
+
+    # Only headings that are present in the group are used to filter rows
+    conditions = []
+
+    for heading, values in row_filter.items():
+        if heading in headings:
+            values = {values} if isinstance(values, str) else set(values)
+            conditions.append((headings.index(heading), values))
+
+    if not conditions:
+        return None
+
+    return lambda row: all(row[j] in values for j, values in conditions)
+
+
+def _tokenize_lines(f, encoding, only_groups=None, start=1):
+    """Tokenize AGS4 file line by line using a new CSV reader for each line.
+
+    Parameters
+    ----------
+    f : file object
+        Open file or any other iterable of lines (str or bytes)
+    encoding : str
+        Encoding used to decode bytes and to strip byte-order marks
+    only_groups : list or None (default=None)
+        Groups to tokenize. Lines in other groups are skipped (see
+        '_skip_unselected_groups()').
+    start : int, default=1
+        Line number of the first line in f
+
+    Yields
+    ------
+    (int, list)
+        Line number and list of fields in the line
+    """
+
+    import csv
+    from io import StringIO
+
+    def read_lines():
+        for i, line in enumerate(f, start=start):
+            if _is_bytebuffer(line):
+                line = line.decode(encoding)
+
+            else:
+                # Strip byte-order mark from line, if present
+                line = _remove_byte_order_mark(line, encoding)
+
+            yield i, line
+
+    lines = read_lines()
+
+    if only_groups:
+        lines = _skip_unselected_groups(lines, only_groups)
+
+    for i, line in lines:
+        yield i, list(csv.reader(StringIO(line), quotechar='"'))[0]
+
+
+def _tokenize_stream(f, encoding, only_groups=None, start=1):
+    """Tokenize AGS4 file in a single CSV reader pass.
+
+    The byte-order mark is only stripped from the first line. Lines with
+    unbalanced quotes cause the CSV reader to continue reading into the
+    following line(s), so such records are tokenized again line by line to
+    return the same result as '_tokenize_lines()'.
+
+    Parameters
+    ----------
+    f : file object
+        Open file or any other iterable of lines (str or bytes)
+    encoding : str
+        Encoding used to decode bytes and to strip byte-order marks
+    only_groups : list or None (default=None)
+        Groups to tokenize. Lines in other groups are skipped (see
+        '_skip_unselected_groups()').
+    start : int, default=1
+        Line number of the first line in f
+
+    Yields
+    ------
+    (int, list)
+        Line number and list of fields in the line
+    """
+
+    import csv
+    from io import StringIO
+
+    def read_lines():
+        for i, line in enumerate(f, start=start):
+            if _is_bytebuffer(line):
+                line = line.decode(encoding)
+
+            elif i == 1:
+                # Strip byte-order mark from first line, if present
+                line = _remove_byte_order_mark(line, encoding)
+
+            yield i, line
+
+    lines = read_lines()
+
+    if only_groups:
+        lines = _skip_unselected_groups(lines, only_groups)
+
+    # Line numbers and raw lines consumed by the CSV reader for the current
+    # record
+    pending = []
+
+    def feed_reader():
+        for i, line in lines:
+            pending.append((i, line))
+            yield line
+
+    for row in csv.reader(feed_reader(), quotechar='"'):
+        if len(pending) == 1:
+            yield pending[0][0], row
+
+        else:
+            for i, line in pending:
+                yield i, list(csv.reader(StringIO(line), quotechar='"'))[0]
+
+        pending.clear()
+
+
+def _tokenize_mmap(f, encoding, only_groups=None, start=1):
+    """Tokenize AGS4 file by memory-mapping it and splitting its lines
+    directly.
+
+    Lines are read from the memory-mapped file as bytes, so that lines in
+    groups that are not selected are skipped without being decoded (except
+    lines with a '\r' that is not part of a '\r\n' line ending, which are
+    decoded to split them at the '\r'). Lines in selected groups are decoded
+    as a whole and then split at the field separators. Lines without quotes
+    and lines in which all fields are quoted are split without a CSV reader,
+    with double-double quotes replaced by single quotes. All other lines are tokenized with a CSV reader to return the
+    same result as '_tokenize_lines()'.
+
+    Files that cannot be memory-mapped (e.g. StringIO, compressed files, empty
+    files, or files in encodings that are not ASCII compatible) are tokenized
+    with '_tokenize_stream()'.
+
+    Parameters
+    ----------
+    f : file object
+        Open file or any other iterable of lines (str or bytes)
+    encoding : str
+        Encoding used to decode bytes and to strip byte-order marks
+    only_groups : list or None (default=None)
+        Groups to tokenize. Lines in other groups are skipped (see
+        '_skip_unselected_groups()').
+    start : int, default=1
+        Line number of the first line in f
+
+    Yields
+    ------
+    (int, list)
+        Line number and list of fields in the line
+    """
+
+    import csv
+    import io
+    import mmap
+    import os
+    import re
+    from io import StringIO
+
+    if not (isinstance(f, io.TextIOWrapper) and isinstance(f.buffer, io.BufferedReader)
+            and isinstance(f.buffer.raw, io.FileIO) and os.fstat(f.fileno()).st_size > 0
+            and '\r\n,"'.encode(encoding) == b'\r\n,"'):
+        yield from _tokenize_stream(f, encoding, only_groups=only_groups, start=start)
+        return
+
+    errors = f.errors
+    skip = False
+    i = start - 1
+
+    def next_group(position):
+        # Offset of the next line that starts with GROUP or "GROUP"
+        while True:
+            position = buffer.find(b'GROUP', position)
+
+            if position == -1:
+                return len(buffer)
+
+            elif buffer[position - 1] == ord('\n'):
+                return position
+
+            elif buffer[position - 1] == ord('"') and buffer[position - 2] == ord('\n'):
+                return position - 1
+
+            position += 1
+
+    def count_lines(start, end):
+        # Number of lines from start to end, counted in chunks so that large
+        # groups are not copied out of the memory-mapped file all at once
+        count = sum(buffer[position:min(position + _MMAP_CHUNK_SIZE, end)].count(b'\n')
+                    for position in range(start, end, _MMAP_CHUNK_SIZE))
+
+        # Last line in the file may not end with '\n'
+        return count + (end > start and buffer[end - 1] != ord('\n'))
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        # Lines that end with a single '\r' have to be split (see below), so
+        # groups can only be skipped without reading them if there are none
+        split_lines = bool(only_groups) and re.search(b'\r(?!\n)', buffer) is not None
+
+        for line in iter(buffer.readline, b''):
+            if skip and not line.startswith((b'"GROUP"', b'GROUP')):
+                if not split_lines:
+                    # Jump to the next GROUP row without reading the lines of
+                    # groups that are not selected
+                    end = next_group(buffer.tell())
+                    i += count_lines(buffer.tell() - len(line), end)
+                    buffer.seek(end)
+                    continue
+
+                if b'\r' not in line.rstrip(b'\n')[:-1] and not line.endswith(b'\r'):
+                    i += 1
+                    continue
+
+            line = line.decode(encoding, errors)
+
+            if i == 0:
+                # Strip byte-order mark from first line, if present
+                line = _remove_byte_order_mark(line, encoding)
+
+            # Lines are only split at '\n' by readline(), so split lines that end
+            # with a single '\r' as well and translate line endings to '\n' (as in
+            # files opened in text mode)
+            for line in re.split('(?<=\r)(?!\n)', line) if '\r' in line.rstrip('\n')[:-1] or line.endswith('\r') else (line,):
+                if not line:
+                    continue
+
+                i += 1
+
+                if line.endswith('\r\n'):
+                    line = line[:-2] + '\n'
+
+                elif line.endswith('\r'):
+                    line = line[:-1] + '\n'
+
+                text = line.rstrip('\n')
+
+                if only_groups and text.startswith(('"GROUP"', 'GROUP')):
+                    fields = next(csv.reader([line]), [])
+
+                    if fields and fields[0] == 'GROUP':
+                        skip = len(fields) > 1 and fields[1] not in only_groups
+
+                        yield i, fields
+                        continue
+
+                if skip:
+                    continue
+
+                if '"' not in text:
+                    yield i, text.split(',') if text else []
+                    continue
+
+                if len(text) > 1 and text[0] == '"' and text[-1] == '"':
+                    fields = text[1:-1].split('","')
+
+                    # All quotes are at the start and end of the fields
+                    if text.count('"') == 2 * len(fields):
+                        yield i, fields
+                        continue
+
+                    # Double-double quotes within fields are escaped quotes
+                    if all('"' not in field.replace('""', '') for field in fields):
+                        yield i, [field.replace('""', '"') for field in fields]
+                        continue
+
+                yield i, list(csv.reader(StringIO(line), quotechar='"'))[0]
+
+
+def _skip_unselected_groups(lines, only_groups):
+    """Drop lines that belong to groups that are not in only_groups.
+
+    GROUP rows are identified with a cheap prefix test, so only the GROUP rows
+    themselves are CSV-parsed to get the group name. The HEADING, UNIT, TYPE,
+    and DATA rows of other groups are dropped without being tokenized. GROUP
+    rows are always passed on so that duplicate groups are still detected.
+
+    Parameters
+    ----------
+    lines : iterable of (int, str)
+        Line numbers and lines
+    only_groups : list
+        Groups to keep
+
+    Yields
+    ------
+    (int, str)
+        Line number and line
+    """
+
+    import csv
+
+    skip = False
+
+    for i, line in lines:
+        if line.startswith(('"GROUP"', 'GROUP')):
+            fields = next(csv.reader([line]), [])
+
+            if fields and fields[0] == 'GROUP':
+                skip = len(fields) > 1 and fields[1] not in only_groups
+
+                yield i, line
+                continue
+
+        if not skip:
+            yield i, line
+
+
+# TYPEs of columns that are stored as Pandas Categoricals by the readers if
+# categorical=True
+_CATEGORICAL_TYPES = ('ID', 'PA', 'PU')
+
+# Size (in bytes) of the chunks of memory-mapped files in which the lines of
+# skipped groups are counted in '_tokenize_mmap()'
+_MMAP_CHUNK_SIZE = 1 << 20
+
+# Minimum size (in bytes) of the sections of a file that are parsed by each
+# worker process in '_parse_groups_in_parallel()'
+_MIN_SECTION_SIZE = 1 << 20
+
+# File extensions and magic bytes used to detect compressed files, and the
+# modules used to read and write them ('zip' is handled separately)
+_COMPRESSION_EXTENSIONS = {'gzip': ('.gz', '.gzip'), 'bz2': ('.bz2',), 'xz': ('.xz', '.lzma'), 'zip': ('.zip',)}
+_COMPRESSION_MAGIC_BYTES = {'gzip': b'\x1f\x8b', 'bz2': b'BZh', 'xz': b'\xfd7zXZ\x00', 'zip': b'PK\x03\x04'}
+_COMPRESSION_MODULES = {'gzip': 'gzip', 'bz2': 'bz2', 'xz': 'lzma'}
+
+# Parser engines available to 'AGS4_to_dict()'
+_PARSER_ENGINES = {'stream': _tokenize_stream,
+                   'line': _tokenize_lines,
+                   'mmap': _tokenize_mmap}
+
+
 class AGS4Error(Exception):
     """Exception class for AGS4 parsing errors.
     """
@@ -23,16 +23,21 @@ import logging
 import os
 import re
 import datetime
+from functools import lru_cache
 from io import StringIO
+from itertools import repeat
+from math import isnan
 from pathlib import Path
+from types import MappingProxyType
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame, concat
 from pandas.errors import MergeError
 
 from python_ags4 import __version__
 
-from .AGS4 import AGS4Error, _is_file_like, format_numeric_column
+from .AGS4 import AGS4Error, AGS4_to_dataframe, _get_compression, _get_zip_member, _format_SF, _is_file_like
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +138,88 @@ def combine_DICT_tables(*ags_tables):
     return master_DICT
 
 
+class DictionaryIndex:
+    """Index of the group and heading definitions in a DICT table.
+
+    The DICT table (usually the output from 'combine_DICT_tables()') is
+    scanned once and the definitions needed to check the schema rules are
+    stored in dictionaries so that they can be looked up by group or heading
+    name. Only DATA rows of the DICT table are considered.
+
+    Parameters
+    ----------
+    dictionary : Pandas DataFrame
+        DICT table
+
+    Attributes
+    ----------
+    headings : dict of lists
+        Headings defined for each group, in the order they appear in the DICT table
+    key_fields : dict of lists
+        KEY fields of each group
+    required_fields : dict of lists
+        REQUIRED fields of each group
+    parent_group : dict
+        Parent group (DICT_PGRP) of each group
+    heading_groups : dict of lists
+        Groups in which each heading is defined
+    types : dict
+        TYPE (DICT_DTYP) of each heading, taken from its first definition
+    units : dict
+        UNIT (DICT_UNIT) of each heading, taken from its first definition
+    """
+
+    def __init__(self, dictionary):
+        self.headings = {}
+        self.key_fields = {}
+        self.required_fields = {}
+        self.parent_group = {}
+        self.heading_groups = {}
+        self.types = {}
+        self.units = {}
+
+        def column(name):
+            if name in dictionary:
+                return dictionary[name].tolist()
+
+            return [None] * dictionary.shape[0]
+
+        # Same case-insensitive match as Series.str.contains(..., case=False)
+        is_key = re.compile('key', re.IGNORECASE).search
+        is_required = re.compile('required', re.IGNORECASE).search
+
+        rows = zip(column('HEADING'), column('DICT_TYPE'), column('DICT_GRP'), column('DICT_HDNG'),
+                   column('DICT_STAT'), column('DICT_DTYP'), column('DICT_UNIT'), column('DICT_PGRP'))
+
+        for row_type, dict_type, group, heading, status, data_type, unit, parent_group in rows:
+            if row_type != 'DATA':
+                continue
+
+            if dict_type == 'GROUP':
+                self.parent_group.setdefault(group, parent_group)
+
+            self.headings.setdefault(group, []).append(heading)
+            self.heading_groups.setdefault(heading, []).append(group)
+            self.types.setdefault(heading, data_type)
+            self.units.setdefault(heading, unit)
+
+            if isinstance(status, str):
+                if is_key(status):
+                    self.key_fields.setdefault(group, []).append(heading)
+
+                if is_required(status):
+                    self.required_fields.setdefault(group, []).append(heading)
+
+
+def _get_dictionary_index(dictionary):
+    """Return DictionaryIndex of DICT table, unless it is already indexed."""
+
+    if isinstance(dictionary, DictionaryIndex):
+        return dictionary
+
+    return DictionaryIndex(dictionary)
+
+
 def fetch_record(record_link, tables):
     """Fetch record(s) defined by an AGS4 record link.
 
@@ -183,6 +270,187 @@ def fetch_record(record_link, tables):
         return DataFrame()
 
 
+class KeyIndex:
+    """Index of the rows in the groups of a file by the values in their key fields.
+
+    The rows of a group are indexed the first time they are looked up using
+    a given list of fields, and the index is then shared by all the rules
+    that look up rows using the same fields (e.g. the parent entries of all
+    child groups of LOCA are looked up in a single index of LOCA_ID). All
+    rows, including the UNIT and TYPE rows, are indexed.
+
+    Parameters
+    ----------
+    tables : dict
+        Dictionary of Pandas DataFrames with all AGS4 data in file
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._rows = {}
+        self._duplicated = {}
+
+    def rows(self, group, fields):
+        """Return row positions of each combination of values in fields.
+
+        Parameters
+        ----------
+        group : str
+            Name of group
+        fields : list
+            Names of fields
+
+        Returns
+        -------
+        dict
+            Dictionary with the positions of the rows (list) with each
+            combination of values (tuple) in the fields
+        """
+
+        key = (group, tuple(fields))
+
+        if key not in self._rows:
+            df = self.tables[group]
+            rows = {}
+
+            for i, values in enumerate(zip(*[df[x].tolist() for x in fields])):
+                rows.setdefault(values, []).append(i)
+
+            self._rows[key] = rows
+
+        return self._rows[key]
+
+    def duplicated(self, group, fields):
+        """Flag rows with combinations of values in fields that are not unique.
+
+        Parameters
+        ----------
+        group : str
+            Name of group
+        fields : list
+            Names of fields
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array that is True for rows with duplicate values (same as
+            'DataFrame.duplicated(fields, keep=False)')
+        """
+
+        key = (group, tuple(fields))
+
+        if key not in self._duplicated:
+            self._duplicated[key] = self.tables[group].duplicated(list(fields), keep=False).to_numpy()
+
+        return self._duplicated[key]
+
+
+class RecordLinkResolver:
+    """Resolve AGS4 record links using hash indexes of the referenced groups.
+
+    A record link refers to the record(s) in a group whose leading fields
+    match the values in the link. The first time a group is referred to by a
+    link with a given number of values, the rows of the group are indexed by
+    the tuple of values in these fields. All links to the group with the same
+    number of values are then resolved by looking up the number of rows in
+    this index, which gives the same result as
+    'fetch_record(record_link, tables).shape[0]'.
+
+    Parameters
+    ----------
+    tables : dict
+        Dictionary of Pandas DataFrames with all AGS4 data in file
+    key_index : KeyIndex, optional
+        Index of rows shared with other rules (a new one is created if not provided)
+    """
+
+    def __init__(self, tables, key_index=None):
+        self.tables = tables
+        self.key_index = key_index or KeyIndex(tables)
+        self._indexes = {}
+
+    def count(self, record_link):
+        """Count records referred to by an AGS4 record link.
+
+        Parameters
+        ----------
+        record_link : list
+            AGS4 Record Link (i.e. TYPE = "RL") converted to an ordered list
+
+        Returns
+        -------
+        int
+            Number of records matching the record link
+        """
+
+        if not record_link:
+            return 0
+
+        index = self._get_index(record_link[0], len(record_link) - 1)
+
+        if index is None:
+            return 0
+
+        positions, rows = index
+
+        return len(rows.get(tuple(record_link[i] for i in positions), ()))
+
+    def resolve(self, record_links):
+        """Count records referred to by each of a batch of AGS4 record links.
+
+        Parameters
+        ----------
+        record_links : list of lists
+            AGS4 Record Links converted to ordered lists
+
+        Returns
+        -------
+        list of int
+            Number of records matching each record link
+        """
+
+        # Links that appear more than once are only resolved once
+        counts = {}
+
+        for record_link in record_links:
+            key = tuple(record_link)
+
+            if key not in counts:
+                counts[key] = self.count(record_link)
+
+        return [counts[tuple(record_link)] for record_link in record_links]
+
+    def _get_index(self, group, n):
+        """Return positions of the values compared in a link to a group with
+        n values, and the rows with each combination of values."""
+
+        if (group, n) in self._indexes:
+            return self._indexes[(group, n)]
+
+        index = None
+
+        try:
+            df = self.tables[group]
+            field_names = df.columns.tolist()[1:]
+
+            # Values are compared with the fields they are assigned to, except for HEADING
+            positions = [i for i, x in enumerate(field_names[0:n], start=1) if re.search(r'[^HEADING]', x)]
+
+            # Links with more values than there are fields, or without any values to
+            # compare, do not refer to any record. Values cannot refer to records
+            # in fields that are not text (e.g. line_number)
+            if 0 < n <= len(field_names) and positions and all(df[field_names[i-1]].dtype == object for i in positions):
+                index = (positions, self.key_index.rows(group, [field_names[i-1] for i in positions]))
+
+        except KeyError:
+            # group not in tables
+            pass
+
+        self._indexes[(group, n)] = index
+
+        return index
+
+
 def pick_standard_dictionary(tables=None, dict_version=None):
     """Pick standard dictionary to check file.
 
@@ -232,6 +500,235 @@ def pick_standard_dictionary(tables=None, dict_version=None):
     return path_to_standard_dictionary
 
 
+class DictionaryCache:
+    """Thread-safe cache of parsed AGS4 dictionary files.
+
+    Dictionary files (e.g. the standard dictionaries returned by
+    'pick_standard_dictionary()') are parsed once per process and kept in
+    memory. Entries are keyed by the path, size and modification time of the
+    file, so a dictionary is parsed again if the file is modified. The least
+    recently used dictionaries are dropped once 'maxsize' dictionaries are
+    held in memory.
+
+    The parsed tables are also saved as compiled (pickled) files in
+    'cache_dir' so that new processes can load them without parsing the
+    dictionary files again. Each compiled file is named after the SHA256 hash
+    of the contents of its source file (and the versions of python_ags4 and
+    pandas), so it is not used if the source file changes and files with the
+    same contents share a compiled file. The least recently used compiled
+    files are deleted once there are more than 'max_files' in 'cache_dir'.
+    The directory is created so that only the current user has access to it,
+    and compiled files that are owned by another user or can be modified by
+    other users are not loaded, as loading them could run arbitrary code.
+
+    The cached tables are shared by all callers (without being copied), so
+    they must not be modified. Tables that have to be modified should be
+    copied first.
+
+    Parameters
+    ----------
+    maxsize : int, default=8
+        Maximum number of dictionaries to keep in memory
+    cache_dir : str, pathlib.Path, or False, optional
+        Directory in which to store compiled dictionary files. Defaults to the
+        directory specified by the PYTHON_AGS4_CACHE_DIR environment variable,
+        or to a 'python-ags4' folder in the user cache directory. Compiled
+        files are not used if set to False.
+    max_files : int, default=16
+        Maximum number of compiled dictionary files to keep in 'cache_dir'
+    """
+
+    def __init__(self, maxsize=8, cache_dir=None, max_files=16):
+        from collections import OrderedDict
+        from threading import Lock
+
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self._tables = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def load(self, dictionary):
+        """Load tables from a dictionary file, parsing it only if it is not
+        already in the cache.
+
+        Parameters
+        ----------
+        dictionary : str, pathlib.Path, or StringIO
+            Path to dictionary file or a file like object (which is not cached)
+
+        Returns
+        -------
+        mapping of dataframes
+            Read-only mapping of the tables in the dictionary file. The tables
+            are shared with the cache, so they must not be modified.
+        """
+
+        if _is_file_like(dictionary):
+            tables, _ = AGS4_to_dataframe(dictionary)
+
+            return MappingProxyType(tables)
+
+        stat = os.stat(dictionary)
+        key = (os.path.realpath(dictionary), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            tables = self._tables.get(key, None)
+
+            if tables is not None:
+                self._tables.move_to_end(key)
+
+        if tables is None:
+            # Parse file outside the lock so that other dictionaries can be
+            # loaded in the meantime
+            tables = self._parse(dictionary)
+
+            with self._lock:
+                self._tables[key] = tables
+                self._tables.move_to_end(key)
+
+                while len(self._tables) > self.maxsize:
+                    self._tables.popitem(last=False)
+
+        # Tables are not copied, as copying them costs a large part of the
+        # time it takes to parse the file
+        return MappingProxyType(tables)
+
+    def clear(self):
+        """Remove all dictionaries from the cache."""
+
+        with self._lock:
+            self._tables.clear()
+
+    def _parse(self, dictionary):
+        import hashlib
+        import pickle
+
+        if self.cache_dir is False:
+            tables, _ = AGS4_to_dataframe(dictionary)
+
+            return tables
+
+        with open(dictionary, 'rb') as f:
+            source = f.read()
+
+        # Compiled files are named after a hash of the contents of the source
+        # file and the versions of python_ags4 and pandas, so that a compiled
+        # file is only loaded if it was created from the same source file by
+        # the same versions of these libraries
+        stamp = hashlib.sha256(source)
+        stamp.update(f'{__version__}|{pd.__version__}'.encode('utf-8'))
+
+        cache_dir = Path(self.cache_dir or _user_cache_dir())
+        compiled_file = cache_dir / f'dictionary-{stamp.hexdigest()[:32]}.pkl'
+
+        try:
+            with open(compiled_file, 'rb') as f:
+                # Loading a pickle can run arbitrary code, so compiled files
+                # are only loaded if no other user could have written them
+                if _is_private_file(f):
+                    tables = pickle.load(f)
+
+                    # Update modification time to keep track of the least recently used files
+                    os.utime(compiled_file)
+
+                    return tables
+
+            logger.warning(f'Compiled dictionary {compiled_file} not loaded as it is not owned by the current user '
+                           'or can be modified by other users.')
+
+        except FileNotFoundError:
+            pass
+
+        except Exception as err:
+            logger.debug(f'Could not load compiled dictionary {compiled_file}: {err}')
+
+        tables, _ = AGS4_to_dataframe(dictionary)
+
+        # Write to a temporary file first so that other processes never read
+        # an incomplete file
+        try:
+            from tempfile import NamedTemporaryFile
+
+            # Only the current user should be able to write to the directory
+            cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+            with NamedTemporaryFile('wb', dir=cache_dir, suffix='.tmp', delete=False) as f:
+                try:
+                    pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+                except Exception:
+                    f.close()
+                    os.remove(f.name)
+                    raise
+
+            os.replace(f.name, compiled_file)
+
+            self._prune(cache_dir)
+
+        except OSError as err:
+            logger.debug(f'Could not save compiled dictionary {compiled_file}: {err}')
+
+        return tables
+
+    def _prune(self, cache_dir):
+        """Delete the least recently used compiled files in excess of 'max_files'."""
+
+        compiled_files = []
+
+        for filepath in cache_dir.glob('dictionary-*.pkl'):
+            try:
+                compiled_files.append((filepath.stat().st_mtime_ns, filepath))
+
+            except OSError:
+                # File deleted by another process
+                pass
+
+        for _, filepath in sorted(compiled_files, reverse=True)[self.max_files:]:
+            try:
+                filepath.unlink()
+
+            except OSError:
+                pass
+
+
+def _is_private_file(f):
+    """Check whether an open file is owned by the current user and cannot be
+    modified by other users. Always True on platforms without user IDs."""
+
+    if not hasattr(os, 'getuid'):
+        return True
+
+    stat = os.fstat(f.fileno())
+
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _user_cache_dir():
+    """Return platform specific directory in which to store cached files."""
+
+    import sys
+
+    if 'PYTHON_AGS4_CACHE_DIR' in os.environ:
+        return Path(os.environ['PYTHON_AGS4_CACHE_DIR'])
+
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')
+
+    return Path(base) / 'python-ags4'
+
+
+# Process-wide cache used by 'check_file()', 'sort_groups()', and 'convert_to_text()'
+dictionary_cache = DictionaryCache()
+
+
 def add_meta_data(filepath_or_buffer, standard_dictionary, ags_errors={}, encoding='utf-8'):
     """Add meta data from input file to error list.
 
@@ -361,6 +858,50 @@ def is_ags_ascii(s):
     return all([ord(c) <= 255 for c in s])
 
 
+def split_line(line):
+    """Split line into fields for the line rules.
+
+    The line is split at '","' and the double quotes enclosing each field are
+    removed. The first field is the data descriptor. Lines are only split once
+    in 'check_file()' and the fields are passed on to all the line rules.
+
+    Parameters
+    ----------
+    line : str
+
+    Returns
+    -------
+    list
+    """
+
+    return [item.strip('"') for item in line.rstrip().split('","')]
+
+
+def has_quoted_fields_only(line, fields):
+    """Check whether all quotes in a line enclose the fields in it (i.e. there
+    are no quotes within fields or fields that are not enclosed in quotes).
+
+    Such lines are split in the same way by 'split_line()' and a CSV reader.
+
+    Parameters
+    ----------
+    line : str
+    fields : list
+        Output from 'split_line()'
+
+    Returns
+    -------
+    bool
+    """
+
+    text = line.rstrip()
+
+    # The enclosing quotes should not be part of the first or last '","'
+    # separator, and all other quotes should be part of a separator
+    return (len(text) > 1 and text[0] == '"' and text[-1] == '"' and not text.startswith('",')
+            and not text.endswith(',"') and text.count('"') == 2 * len(fields))
+
+
 # Line Rules
 
 def rule_1(line, line_number=0, ags_errors={}, encoding='utf-8'):
@@ -396,13 +937,12 @@ def rule_2a(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_3(line, line_number=0, ags_errors={}):
+def rule_3(line, line_number=0, ags_errors={}, fields=None):
     """AGS Format Rule 3: Each line should be start with a data descriptor that defines its contents.
     """
 
     if not line.isspace():
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+        temp = split_line(line) if fields is None else fields
 
         if temp[0] not in ['GROUP', 'HEADING', 'TYPE', 'UNIT', 'DATA']:
             add_error_msg(ags_errors, 'AGS Format Rule 3', line_number, '', 'Does not start with a valid data descriptor.')
@@ -410,13 +950,12 @@ def rule_3(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_4_1(line, line_number=0, ags_errors={}):
+def rule_4_1(line, line_number=0, ags_errors={}, fields=None):
     """AGS Format Rule 4: A GROUP row should only contain the GROUP name as data
     """
 
     if line.startswith('"GROUP"'):
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+        temp = split_line(line) if fields is None else fields
 
         if len(temp) > 2:
             add_error_msg(ags_errors, 'AGS Format Rule 4', line_number, temp[1], 'GROUP row has more than one field.')
@@ -426,12 +965,18 @@ def rule_4_1(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_4_2(line, line_number=0, group='', headings=[], ags_errors={}):
+def rule_4_2(line, line_number=0, group='', headings=[], ags_errors={}, fields=None):
     """AGS Format Rule 4: UNIT, TYPE, and DATA rows should have entries defined by the HEADING row.
     """
 
-    if line.strip('"').startswith(('UNIT', 'TYPE', 'DATA')):
-        temp = list(csv.reader(StringIO(line)))[0]
+    fields = split_line(line) if fields is None else fields
+
+    if fields[0].startswith(('UNIT', 'TYPE', 'DATA')):
+        # Use a CSV reader to count the fields unless all of them are enclosed in quotes
+        if has_quoted_fields_only(line, fields):
+            temp = fields
+        else:
+            temp = list(csv.reader(StringIO(line)))[0]
 
         if len(headings) == 0:
             # Avoid repetitions of same error by adding it only it is not already there
@@ -449,15 +994,17 @@ def rule_4_2(line, line_number=0, group='', headings=[], ags_errors={}):
     return ags_errors
 
 
-def rule_5(line, line_number=0, ags_errors={}):
+def rule_5(line, line_number=0, ags_errors={}, fields=None):
     """AGS Format Rule 5: All fields should be enclosed in double quotes.
     """
 
     if not line.isspace():
+        fields = split_line(line) if fields is None else fields
+
         if not line.startswith('"') or not line.strip('\r\n').endswith('"') or line.strip('\r\n').endswith('","'):
             add_error_msg(ags_errors, 'AGS Format Rule 5', line_number, '', 'Contains fields that are not enclosed in double quotes.')
 
-        elif line.strip('"').startswith(('HEADING', 'UNIT', 'TYPE')):
+        elif fields[0].startswith(('HEADING', 'UNIT', 'TYPE')):
             # If all fields are enclosed in double quotes then splitting by
             # ',' and '","' will return the same number of filelds
             if len(line.split('","')) != len(line.split(',')):
@@ -468,16 +1015,20 @@ def rule_5(line, line_number=0, ags_errors={}):
             # rows that are not enclosed in double quotes will be caught by rule_4b() as
             # they will not be of the same length as the headings row after splitting by '","'.
 
+        elif has_quoted_fields_only(line, fields) and '|' not in line:
+            # There are no quotes within data fields
+            pass
+
         else:
             # Verify that quotes within data fields are enclosed by a second double quote
 
             # First split line using csv.reader. Double quotes enclosing each
             # field and double-double quotes within fields are preseverved by
             # specifying a quotechar that is different from the default '"'.
-            split_line = list(csv.reader(StringIO(line), quotechar='|'))[0]
+            split_fields = list(csv.reader(StringIO(line), quotechar='|'))[0]
 
             # Reassemble line and remove correct double-double quotes
-            temp = " ".join([x.strip('"') for x in split_line])
+            temp = " ".join([x.strip('"') for x in split_fields])
             temp = re.sub(r'""', ' ', temp)
 
             # Find orphan double quotes
@@ -504,14 +1055,14 @@ def rule_6(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_7_1(line, line_number=0, ags_errors={}):
+def rule_7_1(line, line_number=0, ags_errors={}, fields=None):
     """AGS Format Rule 7: HEADINGs shall be in the order described in the AGS4 dictionary.
     Therefore, it should not have duplicated headings.
     """
 
-    if line.strip('"').startswith('HEADING'):
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+    temp = split_line(line) if fields is None else fields
+
+    if temp[0].startswith('HEADING'):
 
         if len(temp) != len(set(temp)):
             add_error_msg(ags_errors, 'AGS Format Rule 7', line_number, '', 'HEADER row has duplicate fields.')
@@ -519,13 +1070,13 @@ def rule_7_1(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_19(line, line_number=0, ags_errors={}):
+def rule_19(line, line_number=0, ags_errors={}, fields=None):
     """AGS Format Rule 19: GROUP name should consist of four uppercase letters.
     """
 
-    if line.strip('"').startswith('GROUP'):
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+    temp = split_line(line) if fields is None else fields
+
+    if temp[0].startswith('GROUP'):
 
         if len(temp) >= 2:
             if (len(temp[1]) != 4) or not temp[1].isupper():
@@ -534,13 +1085,13 @@ def rule_19(line, line_number=0, ags_errors={}):
     return ags_errors
 
 
-def rule_19a(line, line_number=0, group='', ags_errors={}):
+def rule_19a(line, line_number=0, group='', ags_errors={}, fields=None):
     """AGS Format Rule 19a: HEADING names should consist of uppercase letters.
     """
 
-    if line.strip('"').startswith('HEADING'):
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+    temp = split_line(line) if fields is None else fields
+
+    if temp[0].startswith('HEADING'):
 
         if len(temp) >= 2:
             for item in temp[1:]:
@@ -558,14 +1109,14 @@ def rule_19a(line, line_number=0, group='', ags_errors={}):
     return ags_errors
 
 
-def rule_19b_1(line, line_number=0, group='', ags_errors={}):
+def rule_19b_1(line, line_number=0, group='', ags_errors={}, fields=None):
     """AGS Format Rule 19b: HEADING names shall start with the group name followed by an underscore character.
     Where a HEADING refers to an existing HEADING within another GROUP, it shall bear the same name.
     """
 
-    if line.strip('"').startswith('HEADING'):
-        temp = line.rstrip().split('","')
-        temp = [item.strip('"') for item in temp]
+    temp = split_line(line) if fields is None else fields
+
+    if temp[0].startswith('HEADING'):
 
         if len(temp) >= 2:
             for item in temp[1:]:
@@ -644,10 +1195,11 @@ def rule_7_2(headings, dictionary, line_numbers, ags_errors={}):
     """AGS Format Rule 7: HEADINGs shall be in the order described in the AGS4 dictionary.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+
     for key in headings:
         # Extract list of headings defined for the group in the dictionaries
-        mask = dictionary.DICT_GRP == key
-        reference_headings_list = dictionary.loc[mask, 'DICT_HDNG'].tolist()
+        reference_headings_list = dictionary.headings.get(key, [])
 
         # Pick list of headings in current table not including 'HEADING' and 'line_number'
         headings_list = [x for x in headings[key] if x not in ['HEADING', 'line_number']]
@@ -682,194 +1234,241 @@ def rule_8(tables, headings, line_numbers, ags_errors={}):
     """
 
     for group in tables:
-        # First make copy of table to avoid unexpected side-effects
-        df = tables[group].copy()
+        # Tables are not copied as the columns are only read
+        df = tables[group]
+        row_types = df['HEADING'].to_numpy()
 
         try:
-            # Create dictionary of data types in table
-            data_types = df.filter(regex=r'[^line_number]').loc[df.HEADING.eq('TYPE'), :].to_dict('records')[0]
-            # Ditto for units, used in DT and T checks
-            data_units = df.filter(regex=r'[^line_number]').loc[df.HEADING.eq('UNIT'), :].to_dict('records')[0]
+            # Find the first TYPE and UNIT rows in the table
+            type_row = (row_types == 'TYPE').nonzero()[0][0]
+            unit_row = (row_types == 'UNIT').nonzero()[0][0]
 
-            for col, data_type in data_types.items():
-                if 'DP' in data_type:
-                    i = int(data_type.strip('DP'))
+        except IndexError:
+            # No TYPE or UNIT row in table
+            continue
 
-                    if i == 0:
-                        mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.match(r'^-?\d+\.?$')
-                    else:
-                        mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.match(f'^-?\\d+\\.\\d{{{i}}}$')
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not of data type {data_type}.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif 'SCI' in data_type:
-                    i = int(data_type.strip('SCI'))
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.match(f'^-?\\d\\.\\d{{{i}}}[eE][+-]?\\d+$')
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not of data type {data_type}.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif 'SF' in data_type:
-                    i = int(data_type.strip('SF'))
-
-                    # Convert column to numeric values and convert back to correctly formatted strings
-                    df['temp'] = pd.to_numeric(df[col], errors='coerce')
-                    filter_zeros = df['temp'].ne(0.0)  # Filter zeros as significant figures cannot be determined for them
-                    df = format_numeric_column(df, 'temp', data_type)
-
-                    # Compare correctly formatted strings with original strings
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].eq(df['temp']) & filter_zeros
-
-                    # Replace NaN with ? to make error log clearer
-                    df.loc[df.temp.isna(), 'temp'] = '?'
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-
-                        expected_val = row['temp']
-                        msg = f'Value {row[col]} in {col} not of data type {data_type}. (Expected: {expected_val})'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif data_type == 'DT':
-                    data_unit = data_units[col]  # Need to consider the unit to complete this check
-                    # Prep1: The format to be used in the mask1 check (in pd.to_datatime) as 'ISO8601' does not work for time only formats
-                    if data_unit == 'hh:mm':
-                        dtformat = '%H:%M'
-                    elif data_unit == 'hh:mm:ss':
-                        dtformat = '%H:%M:%S'
-                    else:
-                        dtformat = 'ISO8601'  # ok if date (with year) is included
-
-                    # Prep2: The Regex match pattern corresponding to the UNIT to be used in the mask2 check
-                    pattern = ''
-                    for x in data_unit:
-                        if x in ['y', 'm', 'd', 'h', 's']:  # If one of these, assume it is for one of the 'values' in the date or time or time offset
-                            pattern = pattern + r'\d'
-                        elif x == '+':  # + should only appear in timezone offset. If it does, then both + or - are valid
-                            pattern = pattern + '[+-]'
-                        else:  # Anything else, only permit that character, literally.
-                            pattern = pattern + '[' + x + ']'
-                    # Prep3: for the mask1 check we need to strip out the timezone offset, in the unlikely event that there is one
-                    # This method assumes that timezone offset comes after 'Z', as per format required in docs (if no Z, then this will fail)
-                    # TODO: At present, there is no check on whether the timezone offset itself is valid or sensible! Add later?
-                    dftemp = df[col].str.split('Z', expand=True)
-                    df['temp'] = dftemp[0]  # Append temp column to df with datetime/time only for mask1 check
-                    # We now run two independent checks
-                    # mask1: check if string is recognised as a valid datetime (or just time if applciable) using pandas to_datetime
-                    mask1 = df.HEADING.eq('DATA') & ~df[col].eq('') & pd.to_datetime(df['temp'], errors='coerce', format=dtformat).isna()
-                    # mask2: check if string complies with UNIT format using Regex. Timezone offsets should work ok in this.
-                    mask2 = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.fullmatch(pattern)
-                    # Both checks above must be passed:
-                    mask = pd.DataFrame([mask1, mask2]).any()
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} does not match the specified format ({data_unit}) or is an invalid date/time.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif data_type == 'T':
-                    data_unit = data_units[col]  # Need to consider the unit to complete this check
-                    # Prep: The Regex match pattern corresponding to the UNIT to be used in the mask check
-                    if data_unit == 'hh:mm':
-                        pattern = r'\d*\d\d:[0-5]\d'
-                    elif data_unit == 'hh:mm:ss':
-                        pattern = r'\d*\d:[0-5]\d:[0-5]\d'
-                    elif data_unit == 'mm:ss':
-                        pattern = r'[0-5]\d:[0-5]\d'
-                    else:  # Assumes hh:mm:ss if nothing provided
-                        pattern = r'\d*\d:[0-5]\d:[0-5]\d'
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.fullmatch(pattern)
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not in the specified elapsed time format ({data_unit}) or is an invalid elapsed time.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif data_type == 'U':
-                    # Column can contain any numeric value
-                    temp = pd.to_numeric(df[col], errors='coerce')
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & temp.isna()
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not of data type {data_type}. Numeric value expected.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif data_type == 'YN':
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.match(r'^(Y|N|y|n)$')
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not of data type {data_type}.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif data_type == 'DMS':
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & ~df[col].str.match(r'^-?\d+:[0-5]\d:[0-5]\d\.?\d*$')
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} not of data type {data_type} or is an invalid value.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                elif (data_type == 'ID') and col.startswith(group):
-                    mask = df.HEADING.eq('DATA') & ~df[col].eq('') & df.duplicated(col, keep=False)
-
-                    for row in df.loc[mask, :].to_dict('records'):
-                        line_number = int(row['line_number'])
-                        # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                        # that Pandas returns by default
-                        msg = f'Value {row[col]} in {col} is not unique.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
-
-                # elif data_type == 'MC':
-                #     # TODO Add check for MC
-                #     pass
-
-                # elif data_type == 'RL':
-                #     # AGS Format Rule 11 should flag invalid RL entries
-                #     pass
-
-                # elif data_type in ['X', 'XN']:
-                #     # Definition too broad to validate
-                #     pass
+        data_rows = (row_types == 'DATA').nonzero()[0]
 
-        except IndexError:
-            # No TYPE row in table
-            pass
+        for col in [x for x in df.columns if re.search(r'[^line_number]', x)]:
+            values = df[col].to_numpy()
+            data_type = values[type_row]
+
+            # Validator is compiled once for each combination of TYPE and UNIT
+            validator = _rule_8_validator(data_type, values[unit_row])
+
+            # Each distinct value in the DATA rows is only checked once
+            data_values = values[data_rows]
+
+            # Missing values (e.g. in tables that were not read from a file)
+            # are treated as empty entries, as pd.factorize() gives them a
+            # code of -1 that would select the last distinct value
+            is_missing = pd.isna(data_values)
+
+            if is_missing.any():
+                data_values = np.where(is_missing, '', data_values)
+
+            codes, uniques = pd.factorize(data_values)
+
+            if validator is not None:
+                is_invalid, expected = validator.find_invalid(uniques)
+                message = validator.message
+
+            elif (data_type == 'ID') and col.startswith(group):
+                # Duplicates are found by comparing all rows (not just DATA rows) as before
+                is_invalid = np.zeros(len(uniques), dtype=bool)
+                is_invalid[codes[df[col].duplicated(keep=False).to_numpy()[data_rows]]] = True
+                expected = None
+                message = _rule_8_duplicate_message
+
+            else:
+                # MC, RL (checked by AGS Format Rule 11), X and XN are not validated
+                continue
+
+            # Empty entries are always valid
+            is_invalid = is_invalid & (uniques != '')
+
+            invalid_rows = is_invalid[codes].nonzero()[0]
+
+            if invalid_rows.size == 0:
+                continue
+
+            # Batch of invalid entries in the column
+            invalid_values = data_values[invalid_rows].tolist()
+            invalid_lines = df['line_number'].to_numpy()[data_rows[invalid_rows]].tolist()
+            invalid_codes = codes[invalid_rows].tolist()
+
+            for line_number, value, code in zip(invalid_lines, invalid_values, invalid_codes):
+                msg = message(value, col, None if expected is None else expected[code])
+                add_error_msg(ags_errors, 'AGS Format Rule 8', line_number, group, msg)
 
     return ags_errors
 
 
+class _Rule8Validator:
+    """Function to find invalid values of a TYPE/UNIT combination, and the
+    function used to create the error message for each of them."""
+
+    def __init__(self, find_invalid, message):
+        self.find_invalid = find_invalid
+        self.message = message
+
+
+def _rule_8_duplicate_message(value, col, expected):
+    """Error message for duplicate values in ID columns (AGS Format Rule 8)."""
+
+    return f'Value {value} in {col} is not unique.'
+
+
+@lru_cache(maxsize=256)
+def _rule_8_validator(data_type, data_unit):
+    """Compile validator used by AGS Format Rule 8 for a TYPE/UNIT combination.
+
+    Parameters
+    ----------
+    data_type : str
+        TYPE of column
+    data_unit : str
+        UNIT of column (only required for DT and T columns)
+
+    Returns
+    -------
+    _Rule8Validator or None
+        Validator with a 'find_invalid' function that takes an array of values
+        and returns a boolean array that flags invalid values, and an array of
+        expected values (or None). None is returned for TYPEs that are not
+        checked.
+    """
+
+    def regex_validator(pattern, match='match'):
+        match = getattr(re.compile(pattern), match)
+
+        def find_invalid(values):
+            return np.array([match(x) is None for x in values], dtype=bool), None
+
+        return find_invalid
+
+    if 'DP' in data_type:
+        i = int(data_type.strip('DP'))
+
+        if i == 0:
+            find_invalid = regex_validator(r'^-?\d+\.?$')
+        else:
+            find_invalid = regex_validator(f'^-?\\d+\\.\\d{{{i}}}$')
+
+        return _Rule8Validator(find_invalid, lambda value, col, expected: f'Value {value} in {col} not of data type {data_type}.')
+
+    elif 'SCI' in data_type:
+        i = int(data_type.strip('SCI'))
+        find_invalid = regex_validator(f'^-?\\d\\.\\d{{{i}}}[eE][+-]?\\d+$')
+
+        return _Rule8Validator(find_invalid, lambda value, col, expected: f'Value {value} in {col} not of data type {data_type}.')
+
+    elif 'SF' in data_type:
+        # Raise ValueError if number of significant figures is not specified
+        int(data_type.strip('SF'))
+
+        def find_invalid(values):
+            # Convert values to numbers and convert back to correctly formatted strings
+            numbers = np.asarray(pd.to_numeric(pd.Series(values, dtype=object), errors='coerce'), dtype=float)
+
+            # Replace NaN with ? to make error log clearer
+            expected = ['?' if isnan(x) else _format_SF(x, data_type) for x in numbers.tolist()]
+
+            # Filter zeros as significant figures cannot be determined for them
+            is_invalid = (values != np.array(expected, dtype=object)) & (numbers != 0.0)
+            is_invalid[np.isnan(numbers)] = True
+
+            return is_invalid, expected
+
+        return _Rule8Validator(find_invalid,
+                               lambda value, col, expected: f'Value {value} in {col} not of data type {data_type}. (Expected: {expected})')
+
+    elif data_type == 'DT':
+        # Prep1: The format to be used in the mask1 check (in pd.to_datatime) as 'ISO8601' does not work for time only formats
+        if data_unit == 'hh:mm':
+            dtformat = '%H:%M'
+        elif data_unit == 'hh:mm:ss':
+            dtformat = '%H:%M:%S'
+        else:
+            dtformat = 'ISO8601'  # ok if date (with year) is included
+
+        # Prep2: The Regex match pattern corresponding to the UNIT to be used in the mask2 check
+        pattern = ''
+        for x in data_unit:
+            if x in ['y', 'm', 'd', 'h', 's']:  # If one of these, assume it is for one of the 'values' in the date or time or time offset
+                pattern = pattern + r'\d'
+            elif x == '+':  # + should only appear in timezone offset. If it does, then both + or - are valid
+                pattern = pattern + '[+-]'
+            else:  # Anything else, only permit that character, literally.
+                pattern = pattern + '[' + x + ']'
+
+        fullmatch = re.compile(pattern).fullmatch
+
+        def find_invalid(values):
+            # Prep3: for the mask1 check we need to strip out the timezone offset, in the unlikely event that there is one
+            # This method assumes that timezone offset comes after 'Z', as per format required in docs (if no Z, then this will fail)
+            # TODO: At present, there is no check on whether the timezone offset itself is valid or sensible! Add later?
+            temp = pd.Series([x.split('Z')[0] for x in values], dtype=object)
+
+            # We now run two independent checks
+            # mask1: check if string is recognised as a valid datetime (or just time if applciable) using pandas to_datetime
+            mask1 = pd.to_datetime(temp, errors='coerce', format=dtformat).isna().to_numpy()
+            # mask2: check if string complies with UNIT format using Regex. Timezone offsets should work ok in this.
+            mask2 = np.array([fullmatch(x) is None for x in values], dtype=bool)
+
+            # Both checks above must be passed
+            return mask1 | mask2, None
+
+        return _Rule8Validator(find_invalid, lambda value, col, expected: f'Value {value} in {col} does not match the specified format ({data_unit}) '
+                                                                         'or is an invalid date/time.')
+
+    elif data_type == 'T':
+        # Prep: The Regex match pattern corresponding to the UNIT to be used in the mask check
+        if data_unit == 'hh:mm':
+            pattern = r'\d*\d\d:[0-5]\d'
+        elif data_unit == 'hh:mm:ss':
+            pattern = r'\d*\d:[0-5]\d:[0-5]\d'
+        elif data_unit == 'mm:ss':
+            pattern = r'[0-5]\d:[0-5]\d'
+        else:  # Assumes hh:mm:ss if nothing provided
+            pattern = r'\d*\d:[0-5]\d:[0-5]\d'
+
+        return _Rule8Validator(regex_validator(pattern, match='fullmatch'),
+                               lambda value, col, expected: f'Value {value} in {col} not in the specified elapsed time format ({data_unit}) '
+                                                            'or is an invalid elapsed time.')
+
+    elif data_type == 'U':
+        # Column can contain any numeric value
+        def find_invalid(values):
+            return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').isna().to_numpy(), None
+
+        return _Rule8Validator(find_invalid,
+                               lambda value, col, expected: f'Value {value} in {col} not of data type {data_type}. Numeric value expected.')
+
+    elif data_type == 'YN':
+        return _Rule8Validator(regex_validator(r'^(Y|N|y|n)$'),
+                               lambda value, col, expected: f'Value {value} in {col} not of data type {data_type}.')
+
+    elif data_type == 'DMS':
+        return _Rule8Validator(regex_validator(r'^-?\d+:[0-5]\d:[0-5]\d\.?\d*$'),
+                               lambda value, col, expected: f'Value {value} in {col} not of data type {data_type} or is an invalid value.')
+
+    # ID columns are checked for duplicates in rule_8()
+    # MC (TODO), RL (AGS Format Rule 11 should flag invalid RL entries), X and XN (definition too broad to validate)
+    # columns are not checked
+    return None
+
+
 def rule_9(headings, dictionary, line_numbers, ags_errors={}):
     """AGS Format Rule 9: GROUP and HEADING names will be taken from the standard AGS4 dictionary or
     defined in DICT table in the .ags file.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+
     for key in headings:
-        # Extract list of headings defined for the group in the dictionaries
-        mask = dictionary.DICT_GRP == key
-        reference_headings_list = dictionary.loc[mask, 'DICT_HDNG'].tolist()
+        # Extract set of headings defined for the group in the dictionaries
+        reference_headings_list = set(dictionary.headings.get(key, []))
 
         for item in [x for x in headings[key] if x not in ['HEADING', 'line_number']]:
             if item not in reference_headings_list:
@@ -880,14 +1479,16 @@ def rule_9(headings, dictionary, line_numbers, ags_errors={}):
     return ags_errors
 
 
-def rule_10a(tables, headings, dictionary, line_numbers, ags_errors={}):
+def rule_10a(tables, headings, dictionary, line_numbers, ags_errors={}, key_index=None):
     """AGS Format Rule 10a: KEY fields in a GROUP must be present (even if null). There should not be any dupliate KEY field combinations.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+    key_index = key_index or KeyIndex(tables)
+
     for group in tables:
         # Extract KEY fields from dictionary
-        mask = (dictionary.DICT_GRP == group) & (dictionary.DICT_STAT.str.contains('key', case=False))
-        key_fields = dictionary.loc[mask, 'DICT_HDNG'].tolist()
+        key_fields = dictionary.key_fields.get(group, [])
 
         # Check for missing KEY fields
         for heading in key_fields:
@@ -901,14 +1502,12 @@ def rule_10a(tables, headings, dictionary, line_numbers, ags_errors={}):
             # 'HEADING' column has to added explicity as it is not in the key field list
             key_fields = ['HEADING'] + key_fields
 
-            mask = tables[group].duplicated(key_fields, keep=False)
+            mask = key_index.duplicated(group, key_fields)
             duplicate_rows = tables[group].loc[mask, :]
 
             for row in duplicate_rows.to_dict('records'):
                 duplicate_key_combo = '|'.join([row[x] for x in row if x in key_fields])
-                line_number = int(row['line_number'])
-                # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                # that Pandas returns by default
+                line_number = row['line_number']
                 msg = f'Duplicate key field combination: {duplicate_key_combo}'
                 add_error_msg(ags_errors, 'AGS Format Rule 10a', line_number, group, msg)
 
@@ -919,10 +1518,11 @@ def rule_10b(tables, headings, dictionary, line_numbers, ags_errors={}):
     """AGS Format Rule 10b: REQUIRED fields in a GROUP must be present and cannot be empty.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+
     for group in tables:
         # Extract REQUIRED fields from dictionary
-        mask = (dictionary.DICT_GRP == group) & (dictionary.DICT_STAT.str.contains('required', case=False))
-        required_fields = dictionary.loc[mask, 'DICT_HDNG'].tolist()
+        required_fields = dictionary.required_fields.get(group, [])
 
         # Check for missing REQUIRED fields
         for heading in required_fields:
@@ -952,41 +1552,46 @@ def rule_10b(tables, headings, dictionary, line_numbers, ags_errors={}):
         # Add each row with missing entries to the error log
         for row in df_missing_required_fields.drop_duplicates('line_number', keep='last').to_dict('records'):
             msg = '|'.join([row[x] for x in row if x not in ['line_number']])
-            line_number = int(row['line_number'])
-            # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-            # that Pandas returns by default
+            line_number = row['line_number']
             msg = f'Empty REQUIRED fields: {msg}'
             add_error_msg(ags_errors, 'AGS Format Rule 10b', line_number, group, msg)
 
     return ags_errors
 
 
-def rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}):
+def rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}, key_index=None):
     """AGS Format Rule 10c: Each DATA row should have a parent entry in the parent GROUP.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+    key_index = key_index or KeyIndex(tables)
+
     for group in tables:
         # Find parent group name
         # Groups without parents as per the Standard Dictionary are skipped
         if group not in ['PROJ', 'TRAN', 'ABBR', 'DICT', 'UNIT', 'TYPE', 'LOCA', 'FILE', 'LBSG', 'PREM', 'STND']:
 
-            try:
-                mask = (dictionary.DICT_TYPE == 'GROUP') & (dictionary.DICT_GRP == group)
-                parent_group = dictionary.loc[mask, 'DICT_PGRP'].to_list()[0]
+            if group not in dictionary.parent_group:
+                msg = 'Could not check parent entries since group definitions not found in standard dictionary or DICT group.'
+                add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, msg)
+                continue
+
+            parent_group = dictionary.parent_group[group]
 
+            try:
                 # Check whether parent entries exist
                 if parent_group == '':
                     add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, 'Parent group left blank in dictionary.')
 
+                elif parent_group not in tables:
+                    add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, f'Could not find parent group {parent_group}.')
+
                 else:
                     # Extract KEY fields from dictionary
-                    mask = (dictionary.DICT_GRP == parent_group) & (dictionary.DICT_STAT.str.contains('key', case=False))
-                    parent_key_fields = dictionary.loc[mask, 'DICT_HDNG'].tolist()
-                    parent_df = tables[parent_group].copy()
+                    parent_key_fields = dictionary.key_fields.get(parent_group, [])
 
-                    mask = (dictionary.DICT_GRP == group) & (dictionary.DICT_STAT.str.contains('key', case=False))
-                    child_key_fields = dictionary.loc[mask, 'DICT_HDNG'].tolist()
-                    child_df = tables[group].copy()
+                    child_key_fields = dictionary.key_fields.get(group, [])
+                    child_df = tables[group]
 
                     # Return error message if parent group does not have any key fields
                     if not parent_key_fields:
@@ -1002,18 +1607,19 @@ def rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}):
                         add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, msg)
 
                     else:
-                        # Check that both child and parent groups have the parent key fields. Otherwise an IndexError will occur
-                        # when merge operation is attempted
+                        # Check that both child and parent groups have the parent key fields. Otherwise the parent entries
+                        # cannot be looked up
                         if set(parent_key_fields).issubset(set(headings[group])) and set(parent_key_fields).issubset(headings[parent_group]):
-                            # Merge parent and child tables using parent key fields and find entries that not in the
-                            # parent table
-                            orphan_rows = child_df.merge(parent_df, how='left', on=parent_key_fields, indicator=True).query('''_merge=="left_only"''')
+                            # Look up parent key fields of each entry in the index of the parent table (which is
+                            # shared by all of its child groups) to find entries that are not in the parent table
+                            key_fields = [x for x in child_df.columns if x in parent_key_fields]
+                            parent_rows = key_index.rows(parent_group, key_fields)
 
-                            for row in orphan_rows.to_dict('records'):
-                                msg = '|'.join([row[x] for x in row if x in parent_key_fields])
-                                msg = f'Parent entry for line not found in {parent_group}: {msg}'
-                                line_number = int(row['line_number_x'])  # 'line_number_x' because merge appends '_x' to column name in the left table
-                                add_error_msg(ags_errors, 'AGS Format Rule 10c', line_number, group, msg)
+                            for values, line_number in zip(zip(*[child_df[x].tolist() for x in key_fields]), child_df['line_number'].tolist()):
+                                if values not in parent_rows:
+                                    msg = '|'.join(values)
+                                    msg = f'Parent entry for line not found in {parent_group}: {msg}'
+                                    add_error_msg(ags_errors, 'AGS Format Rule 10c', line_number, group, msg)
 
                         else:
                             msg = f'Could not check parent entries due to missing key fields in {group} or {parent_group}. '\
@@ -1022,17 +1628,13 @@ def rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}):
                             add_error_msg(ags_errors, 'AGS Format Rule 10c', line_number, group, msg)
                             # Missing key fields in child and/or parent groups. AGS Format Rule 10a should catch this error.
 
-            except IndexError:
-                msg = 'Could not check parent entries since group definitions not found in standard dictionary or DICT group.'
-                add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, msg)
-
             except KeyError:
                 add_error_msg(ags_errors, 'AGS Format Rule 10c', '-', group, f'Could not find parent group {parent_group}.')
 
     return ags_errors
 
 
-def rule_11(tables, headings, dictionary, ags_errors={}):
+def rule_11(tables, headings, dictionary, ags_errors={}, key_index=None):
     """AGS Format Rule 11: Data of TYPE "RL" shall be delimited by a single character defined under TRAN_DLIM.
     """
 
@@ -1061,7 +1663,7 @@ def rule_11(tables, headings, dictionary, ags_errors={}):
             return ags_errors
 
         else:
-            ags_errors = rule_11c(tables, dictionary, delimiter, concatenator, ags_errors=ags_errors)
+            ags_errors = rule_11c(tables, dictionary, delimiter, concatenator, ags_errors=ags_errors, key_index=key_index)
 
     except KeyError:
         # TRAN group missing. AGS Format Rule 14 should catch this error.
@@ -1074,43 +1676,49 @@ def rule_11(tables, headings, dictionary, ags_errors={}):
     return ags_errors
 
 
-def rule_11c(tables, dictionary, delimiter, concatenator, ags_errors={}):
+def rule_11c(tables, dictionary, delimiter, concatenator, ags_errors={}, key_index=None):
     """AGS Format Rule 11c: Data type "RL" can cross-reference to any group in an AGS4 file
     """
 
+    # Record links in the file and the line numbers and groups in which they are found
+    entries = []
+
     # Check for columns of data type RL
     for group in tables:
-        df = tables[group].copy()
+        df = tables[group]
 
         for col in df:
             if 'RL' in df.loc[df.HEADING == 'TYPE', col].tolist():
                 # Filter out rows with blank RL entries
-                rows_with_record_links = df.loc[df.HEADING.eq('DATA') & df[col].str.contains(r'.+', regex=True), :]
+                mask = df.HEADING.eq('DATA') & df[col].str.contains(r'.+', regex=True)
+
+                entries += zip(repeat(group), df.loc[mask, 'line_number'].tolist(), df.loc[mask, col].tolist())
 
-                for row in rows_with_record_links.to_dict('records'):
-                    record_link = row[col]
-                    line_number = int(row['line_number'])
-                    # line_number is converted to int since the json module (particularly json.dumps) cannot process numpy.int64 data types
-                    # that Pandas returns by default
+    # Convert record links to lists, splitting concatenated links using the concatenator
+    record_links = [item.split(delimiter) for _, _, record_link in entries if delimiter in record_link
+                    for item in record_link.split(concatenator)]
 
-                    # Return error message if delimiter is not found
-                    if delimiter not in record_link:
-                        msg = f'Invalid record link: "{record_link}". "{delimiter}" should be used as delimiter.'
-                        add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
-                        continue
+    # Resolve all record links in one batch
+    counts = iter(RecordLinkResolver(tables, key_index=key_index).resolve(record_links))
 
-                    # Convert record link to list and split using concatenator
-                    record_link = record_link.split(concatenator)
+    for group, line_number, record_link in entries:
+        # Return error message if delimiter is not found
+        if delimiter not in record_link:
+            msg = f'Invalid record link: "{record_link}". "{delimiter}" should be used as delimiter.'
+            add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
+            continue
 
-                    # Check whether each link refers to a valid record
-                    for item in record_link:
-                        if fetch_record(item.split(delimiter), tables).shape[0] < 1:
-                            msg = f'Invalid record link: "{item}". No such record found.'
-                            add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
+        # Check whether each link refers to a valid record
+        for item in record_link.split(concatenator):
+            count = next(counts)
 
-                        elif fetch_record(item.split(delimiter), tables).shape[0] > 1:
-                            msg = f'Invalid record link: "{item}". Link refers to more than one record.'
-                            add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
+            if count < 1:
+                msg = f'Invalid record link: "{item}". No such record found.'
+                add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
+
+            elif count > 1:
+                msg = f'Invalid record link: "{item}". Link refers to more than one record.'
+                add_error_msg(ags_errors, 'AGS Format Rule 11c', line_number, group, msg)
 
     return ags_errors
 
@@ -1332,6 +1940,8 @@ def rule_19b_2(tables, headings, dictionary, line_numbers, ags_errors={}):
     Where a HEADING refers to an existing HEADING within another GROUP, it shall bear the same name.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+
     for group in tables:
 
         # Check heading names in current table not including 'HEADING' and 'line_number'
@@ -1341,8 +1951,8 @@ def rule_19b_2(tables, headings, dictionary, line_numbers, ags_errors={}):
             # The standard dictionaries allow fields like 'SPEC_REF' and 'TEST_STAT' which break AGS Format Rule 19b
             # so headings starting with 'SPEC' and 'TEST' are considered exceptions to the rule
             if ref_group_name not in [group, 'SPEC', 'TEST']:
-                ref_headings_list_1 = dictionary.loc[dictionary.HEADING.eq('DATA') & dictionary.DICT_GRP.eq(ref_group_name), 'DICT_HDNG'].tolist()
-                ref_headings_list_2 = dictionary.loc[dictionary.HEADING.eq('DATA') & dictionary.DICT_GRP.eq(group), 'DICT_HDNG'].tolist()
+                ref_headings_list_1 = dictionary.headings.get(ref_group_name, [])
+                ref_headings_list_2 = dictionary.headings.get(group, [])
 
                 if not ref_headings_list_1:
                     msg = f'Group {ref_group_name} referred to in {heading} could not be found in either the standard dictionary or the DICT group.'
@@ -1367,6 +1977,8 @@ def rule_19b_3(tables, headings, dictionary, line_numbers, ags_errors={}):
     Where a HEADING refers to an existing HEADING within another GROUP, it shall bear the same name.
     """
 
+    dictionary = _get_dictionary_index(dictionary)
+
     for group in tables:
 
         # Check heading names in current table not including 'HEADING' and 'line_number'
@@ -1375,7 +1987,7 @@ def rule_19b_3(tables, headings, dictionary, line_numbers, ags_errors={}):
             try:
                 ref_group_name = heading.split('_')[0]
 
-                if (ref_group_name != group) and heading not in dictionary.DICT_HDNG.to_list():
+                if (ref_group_name != group) and heading not in dictionary.heading_groups:
                     msg = f'{heading} does not start with the name of this group, nor is it defined in another group.'
                     line_number = line_numbers[group]['HEADING']
                     add_error_msg(ags_errors, 'AGS Format Rule 19b', line_number, group, msg)
@@ -1413,26 +2025,55 @@ def rule_20(tables, headings, filepath, ags_errors={}):
                             add_error_msg(ags_errors, 'AGS Format Rule 20', line_number, group, msg)
 
         # Verify that a sub-directory named "FILE" exists in the same directory as the AGS4 file being checked
-        current_dir = os.path.dirname(filepath)
+        if _get_compression(filepath) == 'zip':
+            # Check the contents of the archive if the AGS4 file was read from a zip archive
+            import posixpath
+            import zipfile
+
+            with zipfile.ZipFile(filepath) as archive:
+                names = set(archive.namelist())
+                current_dir = posixpath.dirname(_get_zip_member(archive))
+
+            # Folders are not always stored as separate entries in zip archives
+            dirs = set()
+
+            for name in names:
+                parent = posixpath.dirname(name)
+
+                while parent and parent not in dirs:
+                    dirs.add(parent)
+                    parent = posixpath.dirname(parent)
+
+            join = posixpath.join
+
+            def isdir(path):
+                return path in dirs
+
+            def isfile(path):
+                return path in names
+
+        else:
+            current_dir = os.path.dirname(filepath)
+            join, isdir, isfile = os.path.join, os.path.isdir, os.path.isfile
 
-        if not os.path.isdir(os.path.join(current_dir, 'FILE')):
+        if not isdir(join(current_dir, 'FILE')):
             msg = 'Folder named "FILE" not found. Files defined in the FILE group should be saved in this folder.'
             add_error_msg(ags_errors, 'AGS Format Rule 20', '-', 'FILE', msg)
 
         # Verify entries in FILE group
         for file_fset in set(FILE.loc[FILE.HEADING == 'DATA', 'FILE_FSET'].tolist()):
-            file_fset_path = os.path.join(current_dir, 'FILE', file_fset)
+            file_fset_path = join(current_dir, 'FILE', file_fset)
 
-            if not os.path.isdir(file_fset_path):
+            if not isdir(file_fset_path):
                 msg = f'Sub-folder named "{os.path.join("FILE", file_fset)}" not found even though it is defined in the FILE group.'
                 add_error_msg(ags_errors, 'AGS Format Rule 20', '-', 'FILE', msg)
 
             else:
                 # If sub-directory exists, then continue to check files
                 for file_name in set(FILE.loc[FILE.FILE_FSET == file_fset, 'FILE_NAME'].tolist()):
-                    file_name_path = os.path.join(current_dir, 'FILE', file_fset, file_name)
+                    file_name_path = join(current_dir, 'FILE', file_fset, file_name)
 
-                    if not os.path.isfile(file_name_path):
+                    if not isfile(file_name_path):
                         msg = f'File named "{os.path.join("FILE", file_fset, file_name)}" not found even though it is defined in the FILE group.'
 
                         # Return line numbers where missing entry appears
@@ -1550,7 +2191,7 @@ def fyi_16_1(tables, headings, standard_ABBR, ags_errors={}):
             for row in df.to_dict('records'):
                 msg = f'{row["ABBR_HDNG"]}: Description of abbreviation "{row["ABBR_CODE"]}" is "{row["ABBR_DESC_x"]}" '\
                     f'but it should be "{row["ABBR_DESC_y"]}" according to the standard abbreviations list.'
-                line_number = int(row['line_number'])
+                line_number = row['line_number']
 
                 add_error_msg(ags_errors, 'FYI (Related to Rule 16)', line_number, 'ABBR', msg)
 
@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+
+def pytest_configure(config):
+    # Save compiled dictionary files to a temporary folder instead of the user
+    # cache directory. This is set here rather than in a fixture as some test
+    # modules check files when they are imported.
+    config._python_ags4_cache_dir = tempfile.mkdtemp(prefix='python-ags4-cache-')
+    config._python_ags4_previous_cache_dir = os.environ.get('PYTHON_AGS4_CACHE_DIR')
+    os.environ['PYTHON_AGS4_CACHE_DIR'] = config._python_ags4_cache_dir
+
+
+def pytest_unconfigure(config):
+    if config._python_ags4_previous_cache_dir is None:
+        os.environ.pop('PYTHON_AGS4_CACHE_DIR', None)
+    else:
+        os.environ['PYTHON_AGS4_CACHE_DIR'] = config._python_ags4_previous_cache_dir
+
+    shutil.rmtree(config._python_ags4_cache_dir, ignore_errors=True)
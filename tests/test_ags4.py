@@ -1,3 +1,11 @@
+import asyncio
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, RawIOBase, StringIO
+from pathlib import Path
+
 import toml
 import pandas as pd
 import pytest
@@ -6,6 +14,9 @@ from python_ags4 import AGS4, __version__
 from python_ags4.data import TEST_DATA
 
 
+# Rows of a PROJ group with a single DATA row
+PROJ_LINES = ['"GROUP","PROJ"', '"HEADING","PROJ_ID","PROJ_NAME"', '"UNIT","",""', '"TYPE","ID","X"', '"DATA","P1","Project"']
+
 # Data in LOCA table in test_data.ags
 LOCA = {'HEADING': ['UNIT', 'TYPE', 'DATA', 'DATA', 'DATA', 'DATA'],
         'LOCA_ID': ['', 'ID', 'Location_1', 'Location_2', 'Location_3', 'Location_4'],
@@ -64,6 +75,79 @@ def test_AGS4_bytestream_to_dict(LOCA=LOCA):
     assert tables['LOCA'] == LOCA
 
 
+@pytest.mark.parametrize("engine", ['stream', 'line', 'mmap'])
+def test_AGS4_to_dict_engines(engine, LOCA=LOCA):
+    tables, headings = AGS4.AGS4_to_dict(TEST_DATA, engine=engine)
+
+    assert tables['LOCA'] == LOCA
+
+
+@pytest.mark.parametrize("test_file", ['tests/test_files/4.1-rule5.ags', 'tests/test_files/4.1-rule5-1.ags',
+                                       'tests/test_files/File_with_BOM.ags'])
+def test_AGS4_to_dict_engines_return_same_output(test_file):
+    # Files with BOMs and with unbalanced quotes should be parsed identically by all engines
+    stream = AGS4.AGS4_to_dict(test_file, get_line_numbers=True, engine='stream')
+    line = AGS4.AGS4_to_dict(test_file, get_line_numbers=True, engine='line')
+    mmap = AGS4.AGS4_to_dict(test_file, get_line_numbers=True, engine='mmap')
+
+    assert stream == line == mmap
+
+
+def test_mmap_engine_with_quotes_and_line_endings(tmp_path):
+    # Escaped quotes, fields that are not quoted, unbalanced quotes, and lines
+    # ending with '\r' should be tokenized in the same way as by the CSV reader
+    filepath = tmp_path / 'quotes.ags'
+    filepath.write_bytes(b'"GROUP","TEST"\r\n'
+                         b'"HEADING","TEST_ID","TEST_REM"\r\n'
+                         b'"UNIT","",""\r\n'
+                         b'TYPE,ID,X\r\n'
+                         b'"DATA","1","a ""quoted"" remark"\r\n'
+                         b'"DATA","2","a"",""b"\r'
+                         b'"DATA",3,"c"\r\n'
+                         b'"DATA","4",d"e\r\n'
+                         b'"DATA","5","unbalanced\r\n')
+
+    stream = AGS4.AGS4_to_dict(filepath, get_line_numbers=True, engine='stream')
+    mmap = AGS4.AGS4_to_dict(filepath, get_line_numbers=True, engine='mmap')
+
+    assert stream == mmap
+    assert mmap[0]['TEST']['TEST_REM'][2:] == ['a "quoted" remark', 'a","b', 'c', 'd"e', 'unbalanced\n']
+
+
+@pytest.mark.parametrize("only_groups", [None, ['TEST'], ['PROJ']])
+@pytest.mark.parametrize("last_line", [b'"DATA","2","a"\r', b'"DATA","2","a"\r\r', b'DATA,2,a\r\r', b'"DATA","2","a\r"\r\r'])
+def test_mmap_engine_with_carriage_returns_at_end_of_file(last_line, only_groups, tmp_path):
+    # The last line does not end with '\n', so it has to be split at each '\r'
+    filepath = tmp_path / 'carriage_returns.ags'
+    filepath.write_bytes(b'"GROUP","TEST"\r\n'
+                         b'"HEADING","TEST_ID","TEST_REM"\r\n'
+                         b'"DATA","1","b"\r\n' + last_line)
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        stream = list(AGS4._tokenize_stream(f, 'utf-8', only_groups=only_groups))
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        mmap = list(AGS4._tokenize_mmap(f, 'utf-8', only_groups=only_groups))
+
+    assert stream == mmap
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_mmap_engine_skips_groups_in_chunks(chunk_size, monkeypatch):
+    # Lines of skipped groups are counted in chunks, so line numbers should not depend on the chunk size
+    monkeypatch.setattr(AGS4, '_MMAP_CHUNK_SIZE', chunk_size)
+
+    stream = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True, only_groups=['LOCA', 'LLPL'], engine='stream')
+    mmap = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True, only_groups=['LOCA', 'LLPL'], engine='mmap')
+
+    assert stream == mmap
+
+
+def test_AGS4_to_dict_invalid_engine_raises_error():
+    with pytest.raises(ValueError, match=r"Invalid engine 'fast'.*"):
+        AGS4.AGS4_to_dict(TEST_DATA, engine='fast')
+
+
 @pytest.mark.parametrize("only_groups", [None, ['PROJ', 'TRAN', 'LOCA']])
 def test_AGS4_file_to_dataframe(only_groups, LOCA=LOCA):
     tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA, only_groups=only_groups)
@@ -75,6 +159,92 @@ def test_AGS4_file_to_dataframe(only_groups, LOCA=LOCA):
         assert list(tables.keys()) == only_groups
 
 
+@pytest.mark.parametrize("engine", ['stream', 'line', 'mmap'])
+def test_AGS4_to_dict_with_only_groups(engine):
+    data, headings, line_numbers = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True, only_groups=['LOCA', 'LLPL'],
+                                                     engine=engine)
+    reference_data, _, reference_line_numbers = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True, engine=engine)
+
+    assert list(data.keys()) == ['LOCA', 'LLPL']
+    assert data['LOCA'] == reference_data['LOCA']
+    assert data['LLPL'] == reference_data['LLPL']
+    assert line_numbers['LLPL'] == reference_line_numbers['LLPL']
+
+
+@pytest.mark.parametrize("engine", ['stream', 'line', 'mmap'])
+def test_lines_in_unselected_groups_are_not_parsed(engine):
+    data = StringIO('"GROUP","PROJ"\r\n'
+                    '"HEADING","PROJ_ID","PROJ_NAME"\r\n'
+                    '"UNIT","",""\r\n'
+                    '"TYPE","ID","X"\r\n'
+                    '"DATA","121415"\r\n'
+                    '\r\n'
+                    '"GROUP","TRAN"\r\n'
+                    '"HEADING","TRAN_ISNO"\r\n'
+                    '"UNIT",""\r\n'
+                    '"TYPE","X"\r\n'
+                    '"DATA","1"\r\n')
+
+    # Malformed DATA row in PROJ group should not raise an error if PROJ is not read
+    tables, headings = AGS4.AGS4_to_dataframe(data, only_groups=['TRAN'], engine=engine)
+
+    assert list(tables.keys()) == ['TRAN']
+    assert tables['TRAN'].loc[2, 'TRAN_ISNO'] == '1'
+
+    with pytest.raises(AGS4.AGS4Error, match=r'.*does not have the same number of entries as the HEADING row.*'):
+        AGS4.AGS4_to_dataframe(data, only_groups=['PROJ'], engine=engine)
+
+
+def test_duplicate_unselected_groups_raises_error():
+    with pytest.raises(AGS4.AGS4Error, match=r'.*group duplicated in Line.*'):
+        AGS4.AGS4_to_dataframe('tests/test_files/DuplicateGroups.ags', only_groups=['PROJ'])
+
+
+@pytest.mark.parametrize("get_line_numbers", [False, True])
+def test_AGS4_to_dataframe_with_columns(get_line_numbers, LOCA=LOCA):
+    columns = {'LOCA': ['LOCA_NATN', 'LOCA_ID', 'LOCA_FOO']}
+    output = AGS4.AGS4_to_dataframe(TEST_DATA, columns=columns, get_line_numbers=get_line_numbers)
+    tables, headings = output[0], output[1]
+
+    # Columns are returned in the order in which they appear in the file
+    expected_columns = ['HEADING', 'LOCA_ID', 'LOCA_NATN'] + (['line_number'] if get_line_numbers else [])
+
+    assert headings['LOCA'] == expected_columns
+    assert tables['LOCA'].columns.tolist() == expected_columns
+    assert tables['LOCA'].loc[:, ['HEADING', 'LOCA_ID', 'LOCA_NATN']].equals(pd.DataFrame(LOCA).loc[:, ['HEADING', 'LOCA_ID', 'LOCA_NATN']])
+
+    # Other groups are not affected
+    assert tables['PROJ'].shape[1] == len(headings['PROJ'])
+    assert 'PROJ_NAME' in headings['PROJ']
+
+
+@pytest.mark.parametrize("function", [AGS4.AGS4_to_dict, AGS4.AGS4_to_dataframe])
+def test_columns_with_only_HEADING_column(function, LOCA=LOCA):
+    tables, headings = function(TEST_DATA, columns={'LOCA': ['LOCA_FOO']})
+
+    assert headings['LOCA'] == ['HEADING']
+    assert list(tables['LOCA']['HEADING']) == LOCA['HEADING']
+
+
+@pytest.mark.parametrize("row_filter", [{'LOCA_ID': {'Location_1', 'Location_3'}},
+                                        lambda group, row: row.get('LOCA_ID') in ['Location_1', 'Location_3']])
+def test_AGS4_to_dataframe_with_row_filter(row_filter):
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA, row_filter=row_filter)
+
+    # UNIT and TYPE rows are always kept
+    assert tables['LOCA'].HEADING.tolist() == ['UNIT', 'TYPE', 'DATA', 'DATA']
+    assert tables['LOCA'].LOCA_ID.tolist() == ['', 'ID', 'Location_1', 'Location_3']
+    assert tables['LLPL'].LOCA_ID.tolist() == ['', 'ID', 'Location_1', 'Location_1']
+
+
+def test_row_filter_does_not_affect_groups_without_heading():
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA, row_filter={'LOCA_ID': 'Location_2'})
+    reference_tables, _ = AGS4.AGS4_to_dataframe(TEST_DATA)
+
+    assert tables['LOCA'].LOCA_ID.tolist() == ['', 'ID', 'Location_2']
+    assert tables['PROJ'].equals(reference_tables['PROJ'])
+
+
 def test_AGS4_stream_to_dataframe(LOCA=LOCA):
     with open(TEST_DATA, 'r') as file:
         tables, headings = AGS4.AGS4_to_dataframe(file)
@@ -91,6 +261,434 @@ def test_AGS4_bytestream_to_dataframe(LOCA=LOCA):
     assert tables['LOCA'].equals(pd.DataFrame(LOCA))
 
 
+def test_iter_groups(LOCA=LOCA):
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA)
+
+    groups = []
+    for group, group_headings, df, line_numbers in AGS4.iter_groups(TEST_DATA):
+        groups.append(group)
+
+        assert group_headings == headings[group]
+        assert df.equals(tables[group])
+        assert 'GROUP' in line_numbers
+
+    assert groups == list(tables.keys())
+
+
+def test_iter_groups_with_only_groups(LOCA=LOCA):
+    groups = {group: df for group, _, df, _ in AGS4.iter_groups(TEST_DATA, only_groups=['LOCA'])}
+
+    assert list(groups.keys()) == ['LOCA']
+    assert groups['LOCA'].equals(pd.DataFrame(LOCA))
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 4, 10])
+def test_iter_groups_with_chunksize(chunksize, LOCA=LOCA):
+    chunks = [df for group, _, df, _ in AGS4.iter_groups(TEST_DATA, only_groups=['LOCA'], chunksize=chunksize)]
+
+    # LOCA has four DATA rows
+    assert len(chunks) == -(-4 // chunksize)
+
+    for df in chunks:
+        # UNIT and TYPE rows are repeated in each chunk
+        assert df.HEADING.tolist()[:2] == ['UNIT', 'TYPE']
+        assert 0 < df.HEADING.eq('DATA').sum() <= chunksize
+
+    # Reassembled chunks should be identical to the full table
+    df = pd.concat([chunks[0]] + [x.iloc[2:] for x in chunks[1:]], ignore_index=True)
+
+    assert df.equals(pd.DataFrame(LOCA))
+
+
+def test_line_numbers_are_stored_as_integers():
+    data, _, _ = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True)
+
+    assert data['LOCA']['line_number'].typecode == 'q'
+    assert data['LOCA']['line_number'].tolist() == list(range(58, 64))
+
+    tables, _, _ = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+
+    assert tables['LOCA']['line_number'].dtype == 'int64'
+
+    chunks = [df for _, _, df, _ in AGS4.iter_groups(TEST_DATA, get_line_numbers=True, only_groups=['LOCA'], chunksize=3)]
+
+    assert chunks[1]['line_number'].tolist() == [58, 59, 63]
+
+
+def test_iter_groups_yields_groups_before_duplicate_group_error():
+    groups = []
+
+    with pytest.raises(AGS4.AGS4Error, match=r'.*group duplicated in Line.*'):
+        for group, _, _, _ in AGS4.iter_groups('tests/test_files/DuplicateGroups.ags'):
+            groups.append(group)
+
+    assert 'PROJ' in groups
+
+
+def test_index_groups():
+    index = AGS4.index_groups(TEST_DATA)
+    _, _, line_numbers = AGS4.AGS4_to_dict(TEST_DATA, get_line_numbers=True)
+
+    assert index['LOCA']['line_numbers'] == {'GROUP': 56, 'HEADING': 57, 'UNIT': 58, 'TYPE': 59, 'DATA': 60, 'end': 64}
+    assert index['LOCA']['data_rows'] == 4
+
+    for group, entry in index.items():
+        assert entry['line_numbers']['GROUP'] == line_numbers[group]['GROUP']
+
+    with open(TEST_DATA, 'rb') as f:
+        f.seek(index['LOCA']['offsets']['GROUP'])
+        assert f.readline().startswith(b'"GROUP","LOCA"')
+
+
+def test_read_groups_using_index():
+    index = AGS4.index_groups(TEST_DATA)
+
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+    tables_from_index, headings_from_index, line_numbers_from_index = AGS4.AGS4_to_dataframe(TEST_DATA,
+                                                                                             get_line_numbers=True,
+                                                                                             index=index)
+
+    assert headings_from_index == headings
+    assert line_numbers_from_index == line_numbers
+
+    for group, df in tables.items():
+        assert tables_from_index[group].equals(df)
+
+    groups = [group for group, _, _, _ in AGS4.iter_groups(TEST_DATA, only_groups=['LLPL', 'LOCA'], index=index)]
+
+    assert groups == ['LOCA', 'LLPL']
+
+
+def test_index_groups_sidecar(tmp_path):
+    filepath = tmp_path / 'test_data.ags'
+    filepath.write_bytes(open(TEST_DATA, 'rb').read())
+
+    index = AGS4.index_groups(filepath, sidecar=True)
+
+    assert (tmp_path / 'test_data.ags.index.json').exists()
+    assert AGS4.index_groups(filepath, sidecar=True) == index
+
+
+@pytest.mark.parametrize("newline", ['\r\n', '\n', '\r'])
+def test_read_groups_using_index_with_whitespace_lines_and_line_endings(newline, tmp_path, monkeypatch):
+    # Line with only whitespace does not end a group, so the following DATA rows should not be dropped
+    rows = [f'"DATA","P{i}","Project {i}"' for i in range(1, 40)]
+    lines = ['"GROUP","PROJ"', '"HEADING","PROJ_ID","PROJ_NAME"', '"UNIT","",""', '"TYPE","ID","X"',
+             rows[0], '  ', *rows[1:20], ' \r ', *rows[20:], '',
+             '"GROUP","TRAN"', '"HEADING","TRAN_ISNO"', '"UNIT",""', '"TYPE","X"', '"DATA","1"']
+    filepath = tmp_path / 'test.ags'
+    filepath.write_bytes(newline.join(lines).encode('utf-8'))
+
+    # Reduce section size to split the file within groups
+    monkeypatch.setattr(AGS4, '_MIN_SECTION_SIZE', 200)
+
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(filepath, get_line_numbers=True)
+    index = AGS4.index_groups(filepath)
+    ags_file = AGS4.AGS4File(filepath, get_line_numbers=True)
+
+    assert tables['PROJ'].PROJ_ID.tolist()[-2:] == ['P38', 'P39']
+    assert index['PROJ']['data_rows'] == len(rows)
+    assert ags_file.headings == headings
+    assert ags_file.line_numbers == line_numbers
+
+    for kwargs in [{'index': index}, {'parallel': True, 'workers': 2}]:
+        tables_from_index, headings_from_index, line_numbers_from_index = AGS4.AGS4_to_dataframe(filepath,
+                                                                                                 get_line_numbers=True,
+                                                                                                 **kwargs)
+        assert headings_from_index == headings
+        assert line_numbers_from_index == line_numbers
+
+        for group, df in tables.items():
+            assert tables_from_index[group].equals(df)
+            assert ags_file[group].equals(df)
+
+
+def test_index_groups_with_duplicate_groups_raises_error():
+    with pytest.raises(AGS4.AGS4Error, match=r'.*group duplicated in Line.*'):
+        AGS4.index_groups('tests/test_files/DuplicateGroups.ags')
+
+
+@pytest.mark.parametrize("lines, match", [
+    (['"HEADING","X"', *PROJ_LINES], r'HEADER row in Line 1 is not associated with a GROUP.*'),
+    ([*PROJ_LINES, '', '"DATA","P2","extra"'], r'DATA row in Line 7 is not associated with a GROUP.*'),
+    ([*PROJ_LINES, '"GROUP"'], r'GROUP row in Line 6 does not have a group name.*')])
+def test_index_groups_with_rows_outside_groups_raises_error(lines, match, tmp_path):
+    filepath = tmp_path / 'test.ags'
+    filepath.write_text('\r\n'.join(lines) + '\r\n', encoding='utf-8')
+
+    # Rows outside groups would be dropped if the file was read using the index
+    with pytest.raises(AGS4.AGS4Error, match=match):
+        AGS4.index_groups(filepath)
+
+
+def test_read_groups_with_index_true():
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA, only_groups=['LOCA'])
+    tables_from_index, headings_from_index = AGS4.AGS4_to_dataframe(TEST_DATA, only_groups=['LOCA'], index=True)
+
+    assert headings_from_index == headings
+    assert tables_from_index['LOCA'].equals(tables['LOCA'])
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_read_groups_with_invalid_index_raises_error(parallel):
+    with pytest.raises(TypeError, match=r"index should be a dictionary created by 'index_groups\(\)' or True, not str."):
+        AGS4.AGS4_to_dataframe(TEST_DATA, index='index.json', parallel=parallel)
+
+
+def test_AGS4_to_dataframe_with_typed(LOCA=LOCA):
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA, typed=True)
+    df = tables['LOCA']
+
+    assert df.HEADING.tolist() == ['DATA'] * 4
+    assert df.LOCA_NATE.dtype == 'float64'
+    assert df.LOCA_STAR.dtype == 'datetime64[ns]'
+    assert df.LOCA_ID.tolist() == LOCA['LOCA_ID'][2:]
+    assert df.attrs['TYPE']['LOCA_FDEP'] == '2DP'
+    assert df.attrs['UNIT']['LOCA_FDEP'] == 'm'
+
+    # Numeric columns should match the output of convert_to_numeric()
+    assert df.LOCA_FDEP.equals(AGS4.convert_to_numeric(pd.DataFrame(LOCA)).LOCA_FDEP)
+
+
+def test_AGS4_to_dataframe_with_typed_keeps_values_that_cannot_be_converted():
+    data = StringIO('"GROUP","TEST"\r\n'
+                    '"HEADING","TEST_ID","TEST_NUM","TEST_FLAG","TEST_TIME"\r\n'
+                    '"UNIT","","m","","hh:mm:ss"\r\n'
+                    '"TYPE","ID","2DP","YN","T"\r\n'
+                    '"DATA","A","1.00","Y","01:30:00"\r\n'
+                    '"DATA","B","<0.01","N",""\r\n'
+                    '"DATA","C","","Y","00:15:00"\r\n')
+
+    tables, _ = AGS4.AGS4_to_dataframe(data, typed=True)
+    df = tables['TEST']
+
+    assert df.TEST_NUM.tolist()[:2] == [1.0, '<0.01']
+    assert pd.isna(df.TEST_NUM[2])
+    assert df.TEST_FLAG.dtype == bool
+    assert df.TEST_FLAG.tolist() == [True, False, True]
+    assert df.TEST_TIME.dtype == 'timedelta64[ns]'
+    assert df.TEST_TIME[0] == pd.Timedelta(minutes=90)
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_AGS4_to_dataframe_with_categorical(typed):
+    rows = ''.join(f'"DATA","BH{i % 2}","{i}","{i}.00","U"\r\n' for i in range(10))
+    data = StringIO('"GROUP","SAMP"\r\n'
+                    '"HEADING","LOCA_ID","SAMP_ID","SAMP_TOP","SAMP_TYPE"\r\n'
+                    '"UNIT","","","m",""\r\n'
+                    '"TYPE","ID","ID","2DP","PA"\r\n' + rows)
+
+    tables, _ = AGS4.AGS4_to_dataframe(data, typed=typed)
+    categorical_tables, _ = AGS4.AGS4_to_dataframe(data, typed=typed, categorical=True)
+    df = categorical_tables['SAMP']
+
+    assert df.HEADING.dtype == 'category'
+    assert df.LOCA_ID.dtype == 'category'
+    assert df.SAMP_TYPE.dtype == 'category'
+
+    # Columns with mostly unique values are not converted
+    assert df.SAMP_ID.dtype == object
+
+    assert df.astype({'HEADING': object, 'LOCA_ID': object, 'SAMP_TYPE': object}).equals(tables['SAMP'])
+
+    # Values in the HEADING column of all rows and values in columns with ID,
+    # PA, and PU TYPEs from the TYPE row onwards should be interned (columns
+    # of this table are not converted as all their values are unique)
+    def is_interned(value):
+        return sys.intern(value.encode().decode()) is value
+
+    data = StringIO('"GROUP","SAMP"\r\n'
+                    '"HEADING","LOCA_ID","SAMP_TYPE","SAMP_REM"\r\n'
+                    '"UNIT","unit_1","unit_2","unit_3"\r\n'
+                    '"TYPE","ID","PA","X"\r\n'
+                    '"DATA","BH01","U100","remark"\r\n')
+
+    df = AGS4.AGS4_to_dataframe(data, categorical=True)[0]['SAMP']
+
+    assert df.HEADING.dtype == object
+    assert df.HEADING.tolist() == ['UNIT', 'TYPE', 'DATA']
+    assert all(is_interned(value) for value in df.HEADING)
+    assert all(is_interned(value) for value in df.loc[1:, ['LOCA_ID', 'SAMP_TYPE']].to_numpy().ravel())
+
+    # Values before the TYPE row and values in other columns should be left alone
+    assert not any(is_interned(value) for value in df.loc[0, ['LOCA_ID', 'SAMP_TYPE', 'SAMP_REM']])
+    assert not is_interned(df.loc[2, 'SAMP_REM'])
+
+
+@pytest.mark.parametrize("section_size", [1, 200, 1 << 20])
+def test_AGS4_to_dataframe_in_parallel(section_size, monkeypatch):
+    # Reduce section size to split the file between groups and within groups
+    monkeypatch.setattr(AGS4, '_MIN_SECTION_SIZE', section_size)
+
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+    tables_in_parallel, headings_in_parallel, line_numbers_in_parallel = AGS4.AGS4_to_dataframe(TEST_DATA,
+                                                                                                get_line_numbers=True,
+                                                                                                parallel=True,
+                                                                                                workers=2)
+
+    assert list(tables_in_parallel) == list(tables)
+    assert headings_in_parallel == headings
+    assert line_numbers_in_parallel == line_numbers
+
+    for group, df in tables.items():
+        assert tables_in_parallel[group].equals(df)
+
+
+@pytest.mark.parametrize("filepath, match", [('tests/test_files/DuplicateGroups.ags', r'SAMP group duplicated in Line 42.*'),
+                                              ('tests/test_files/Row_with_missing_field.ags', r'Line 5 does not have the same.*')])
+def test_AGS4_to_dataframe_in_parallel_raises_error(filepath, match, monkeypatch):
+    monkeypatch.setattr(AGS4, '_MIN_SECTION_SIZE', 1)
+
+    with pytest.raises(AGS4.AGS4Error, match=match):
+        AGS4.AGS4_to_dataframe(filepath, parallel=True, workers=2)
+
+
+@pytest.mark.parametrize("lines", [['"HEADING","X"', *PROJ_LINES],
+                                   [*PROJ_LINES, '', '"DATA","P2","extra"', '"HEADING","X"']])
+@pytest.mark.parametrize("only_groups", [None, ['PROJ'], ['LOCA']])
+def test_AGS4_to_dataframe_in_parallel_with_rows_outside_groups(lines, only_groups, tmp_path, monkeypatch):
+    # Rows that are not in a group should not be dropped silently
+    monkeypatch.setattr(AGS4, '_MIN_SECTION_SIZE', 1)
+
+    filepath = tmp_path / 'test.ags'
+    filepath.write_text('\r\n'.join(lines) + '\r\n', encoding='utf-8')
+
+    try:
+        expected = AGS4.AGS4_to_dataframe(filepath, only_groups=only_groups)
+
+    except Exception as err:
+        with pytest.raises(type(err), match=re.escape(str(err))):
+            AGS4.AGS4_to_dataframe(filepath, only_groups=only_groups, parallel=True, workers=2)
+
+    else:
+        tables, headings = AGS4.AGS4_to_dataframe(filepath, only_groups=only_groups, parallel=True, workers=2)
+
+        assert headings == expected[1]
+        assert tables.keys() == expected[0].keys()
+        assert all(tables[group].equals(expected[0][group]) for group in tables)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_many(workers):
+    filepaths = [TEST_DATA, 'tests/test_files/DuplicateGroups.ags', 'tests/test_files/example1.ags']
+
+    tables, headings, errors = AGS4.read_many(filepaths, workers=workers, only_groups=['PROJ', 'LOCA'])
+
+    assert list(tables) == [TEST_DATA, 'tests/test_files/example1.ags']
+    assert list(errors) == ['tests/test_files/DuplicateGroups.ags']
+    assert isinstance(errors['tests/test_files/DuplicateGroups.ags'], AGS4.AGS4Error)
+
+    expected_tables, expected_headings = AGS4.AGS4_to_dataframe(TEST_DATA, only_groups=['PROJ', 'LOCA'])
+
+    assert headings[TEST_DATA] == expected_headings
+    assert tables[TEST_DATA]['LOCA'].equals(expected_tables['LOCA'])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_many_with_missing_groups_and_unreadable_files(workers, tmp_path):
+    missing_file = str(tmp_path / 'missing.ags')
+    directory = str(tmp_path)
+
+    # TEST_DATA does not have a SAMP group
+    filepaths = [TEST_DATA, missing_file, directory, 'tests/test_files/example1.ags']
+
+    tables, headings, errors = AGS4.read_many(filepaths, workers=workers, only_groups=['SAMP', 'LOCA'])
+
+    assert list(tables) == [TEST_DATA, 'tests/test_files/example1.ags']
+    assert list(tables[TEST_DATA]) == ['LOCA']
+    assert list(tables['tests/test_files/example1.ags']) == ['SAMP', 'LOCA']
+
+    assert isinstance(errors[missing_file], FileNotFoundError)
+    assert isinstance(errors[directory], IsADirectoryError)
+
+    tables, headings, errors = AGS4.read_many(filepaths, workers=workers, only_groups=['SAMP', 'LOCA'], concat=True)
+
+    assert set(tables) == {'SAMP', 'LOCA'}
+    assert set(tables['SAMP'].source_file) == {'tests/test_files/example1.ags'}
+
+
+def test_read_many_with_concat():
+    filepaths = [TEST_DATA, 'tests/test_files/example1.ags']
+
+    tables, headings, errors = AGS4.read_many(filepaths, workers=1, only_groups=['LOCA'], concat=True)
+
+    LOCA_1, _ = AGS4.AGS4_to_dataframe(TEST_DATA, only_groups=['LOCA'])
+    LOCA_2, _ = AGS4.AGS4_to_dataframe('tests/test_files/example1.ags', only_groups=['LOCA'])
+
+    assert errors == {}
+    assert len(tables['LOCA']) == len(LOCA_1['LOCA']) + len(LOCA_2['LOCA'])
+    assert tables['LOCA'].source_file.dtype == 'category'
+    assert tables['LOCA'].source_file.value_counts()[str(TEST_DATA)] == len(LOCA_1['LOCA'])
+    assert headings['LOCA'][0] == 'HEADING'
+    assert headings['LOCA'][-1] == 'source_file'
+
+
+def test_AGS4File(LOCA=LOCA):
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+
+    ags_file = AGS4.AGS4File(TEST_DATA, get_line_numbers=True)
+
+    # Headings and line numbers are available before any table is loaded
+    assert ags_file.headings == headings
+    assert ags_file.line_numbers == line_numbers
+    assert list(ags_file) == list(tables)
+    assert len(ags_file) == len(tables)
+
+    for group, df in tables.items():
+        assert ags_file[group].equals(df)
+
+    assert AGS4.AGS4File(TEST_DATA)['LOCA'].equals(pd.DataFrame(LOCA))
+
+    with pytest.raises(KeyError):
+        ags_file['ABCD']
+
+
+def test_AGS4File_drops_least_recently_used_tables():
+    ags_file = AGS4.AGS4File(TEST_DATA, max_groups=2)
+
+    LOCA = ags_file['LOCA']
+    ags_file['PROJ']
+    assert ags_file['LOCA'] is LOCA
+
+    ags_file['LLPL']
+    assert list(ags_file._tables) == ['LOCA', 'LLPL']
+
+
+def test_AGS4File_with_invalid_files(tmp_path):
+    filepath = tmp_path / 'test.ags'
+
+    # Rows outside groups cannot be read using the index, so they should not be dropped
+    filepath.write_text('\r\n'.join([*PROJ_LINES, '', '"DATA","P2","extra"']) + '\r\n', encoding='utf-8')
+
+    with pytest.raises(AGS4.AGS4Error, match=r'DATA row in Line 7 is not associated with a GROUP.*'):
+        AGS4.AGS4File(filepath)
+
+    # Headings and line numbers should be taken from the last HEADING row, as in the parser
+    filepath.write_text('\r\n'.join([*PROJ_LINES[:1], '"HEADING","X"', *PROJ_LINES[1:]]) + '\r\n', encoding='utf-8')
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(filepath, get_line_numbers=True)
+    ags_file = AGS4.AGS4File(filepath, get_line_numbers=True)
+
+    assert ags_file.headings == headings
+    assert ags_file.line_numbers == line_numbers
+    assert ags_file['PROJ'].equals(tables['PROJ'])
+
+    # Modified file should not be read using the stale index
+    ags_file.clear_cache()
+
+    with open(filepath, 'a', newline='') as f:
+        f.write('"DATA","P2","Project 2"\r\n')
+
+    with pytest.raises(AGS4.AGS4Error, match=r'.*has been modified since it was indexed.*'):
+        ags_file['PROJ']
+
+    # KeyError should be raised if the group is not found in its byte range
+    ags_file = AGS4.AGS4File(filepath)
+    ags_file.index['PROJ']['offsets']['GROUP'] = ags_file.index['PROJ']['offsets']['end']
+
+    with pytest.raises(KeyError, match='PROJ'):
+        ags_file['PROJ']
+
+
 def test_convert_to_numeric():
     tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA)
     LOCA = AGS4.convert_to_numeric(tables['LOCA'])
@@ -126,6 +724,36 @@ def test_dataframe_to_AGS4():
     assert tables['LOCA'].equals(new_tables['LOCA'])
 
 
+@pytest.mark.parametrize('extension, compression', [('.ags.gz', 'infer'), ('.ags.bz2', 'infer'),
+                                                    ('.ags.xz', 'infer'), ('.zip', 'infer'), ('.ags', 'gzip')])
+def test_dataframe_to_AGS4_with_compression(tmp_path, extension, compression):
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA)
+
+    filepath = tmp_path / f'output{extension}'
+    AGS4.dataframe_to_AGS4(tables, headings, filepath, compression=compression)
+
+    # Compressed output is detected from the extension or the magic bytes of the file
+    assert filepath.read_bytes()[:2] != b'"G'
+
+    new_tables, new_headings = AGS4.AGS4_to_dataframe(filepath)
+
+    assert headings == new_headings
+    assert all(tables[group].equals(new_tables[group]) for group in tables)
+
+    # Reading in parallel falls back to the serial parser
+    new_tables, new_headings = AGS4.AGS4_to_dataframe(filepath, parallel=True)
+
+    assert all(tables[group].equals(new_tables[group]) for group in tables)
+
+
+def test_index_groups_of_compressed_file_raises_error(tmp_path):
+    tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA)
+    AGS4.dataframe_to_AGS4(tables, headings, tmp_path / 'output.ags.gz')
+
+    with pytest.raises(ValueError, match='Compressed files cannot be indexed'):
+        AGS4.index_groups(tmp_path / 'output.ags.gz')
+
+
 def test_dataframe_to_AGS4_with_modified_table():
     tables, headings = AGS4.AGS4_to_dataframe(TEST_DATA)
 
@@ -290,6 +918,109 @@ def test_check_stream():
         assert 'Rule' not in error_list.keys()
 
 
+class NonSeekableStream(RawIOBase):
+    # Binary stream that can only be read once (e.g. an HTTP request body)
+    def __init__(self, filepath):
+        self.data = BytesIO(Path(filepath).read_bytes())
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.data.readinto(buffer)
+
+
+def test_check_non_seekable_binary_stream():
+    error_list = AGS4.check_file(NonSeekableStream(TEST_DATA))
+    reference_error_list = AGS4.check_file(TEST_DATA)
+
+    # File name and file size are not added when a stream is checked
+    assert [x['desc'] for x in error_list.pop('Metadata')][-1] == reference_error_list.pop('Metadata')[-1]['desc']
+    assert error_list == reference_error_list
+
+    tables, headings = AGS4.AGS4_to_dataframe(NonSeekableStream(TEST_DATA))
+
+    assert tables['LOCA'].equals(pd.DataFrame(LOCA))
+
+
+class AsyncUpload:
+    # Async byte stream with an async read() method (e.g. an uploaded file)
+    def __init__(self, filepath):
+        self.data = BytesIO(Path(filepath).read_bytes())
+
+    async def read(self, size=-1):
+        return self.data.read(size)
+
+
+async def async_chunks(filepath, size=100):
+    # Async iterable of bytes (e.g. a request body)
+    data = Path(filepath).read_bytes()
+
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_acheck_file():
+    async def check_files():
+        semaphore = asyncio.Semaphore(2)
+
+        return await asyncio.gather(AGS4.acheck_file(TEST_DATA, semaphore=semaphore),
+                                    AGS4.acheck_file(AsyncUpload(TEST_DATA), semaphore=semaphore),
+                                    AGS4.acheck_file(async_chunks(TEST_DATA), semaphore=semaphore))
+
+    reference_error_list = AGS4.check_file(TEST_DATA)
+
+    for error_list in asyncio.run(check_files()):
+        # File name and file size are not added when a stream is checked
+        error_list.pop('Metadata')
+
+        assert error_list == {key: value for key, value in reference_error_list.items() if key != 'Metadata'}
+
+
+@pytest.mark.parametrize("source", [TEST_DATA, AsyncUpload, async_chunks])
+def test_aiter_groups(source):
+    async def read_groups():
+        filepath_or_buffer = source(TEST_DATA) if callable(source) else source
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return [item async for item in AGS4.aiter_groups(filepath_or_buffer, executor=executor)]
+
+    reference = list(AGS4.iter_groups(TEST_DATA))
+    groups = asyncio.run(read_groups())
+
+    assert [group for group, _, _, _ in groups] == [group for group, _, _, _ in reference]
+
+    for (_, headings, df, _), (_, reference_headings, reference_df, _) in zip(groups, reference):
+        assert headings == reference_headings
+        assert df.equals(reference_df)
+
+
+def test_aiter_groups_cancelled_while_parsing():
+    started = threading.Event()
+    release = threading.Event()
+
+    def row_filter(group, row):
+        started.set()
+        return release.wait(timeout=10)
+
+    async def read_groups():
+        return [item async for item in AGS4.aiter_groups(TEST_DATA, row_filter=row_filter)]
+
+    async def cancel_while_parsing():
+        task = asyncio.create_task(read_groups())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+
+        # Group is still being parsed in the executor when the task is cancelled
+        task.cancel()
+        await asyncio.sleep(0.1)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_parsing())
+
+
 @pytest.mark.parametrize("dict_version", ['4.2', '4.1.1', '4.1', '4.0.4', '4.0.3'])
 def test_check_file_with_specified_dictionary_version(dict_version):
     error_list = AGS4.check_file(TEST_DATA, standard_AGS4_dictionary=dict_version)
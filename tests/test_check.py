@@ -1,4 +1,7 @@
 import os
+import zipfile
+
+import pytest
 
 from python_ags4 import AGS4, check, __version__
 from python_ags4.data import TEST_DATA
@@ -142,6 +145,25 @@ def test_rule_5_3():
     assert 'AGS Format Rule 5' not in error_list.keys()
 
 
+@pytest.mark.parametrize('line, errors', [('"DATA","1","a ""quoted"" remark"\r\n', 0),
+                                          ('"DATA","1","a "quoted" remark"\r\n', 1),
+                                          ('"DATA","1",2\r\n', 1),
+                                          ('","DATA","1"x"\r\n', 1)])
+def test_line_rules_with_shared_fields(line, errors):
+    # Line rules should return the same errors whether or not the fields are passed in
+    fields = check.split_line(line)
+
+    for rule in [check.rule_3, check.rule_4_1, check.rule_5, check.rule_7_1, check.rule_19, check.rule_19a,
+                 check.rule_19b_1]:
+        assert rule(line, 1, ags_errors={}, fields=fields) == rule(line, 1, ags_errors={})
+
+    headings = ['HEADING', 'TEST_ID', 'TEST_REM']
+
+    assert check.rule_4_2(line, 1, 'TEST', headings, ags_errors={}, fields=fields) == \
+        check.rule_4_2(line, 1, 'TEST', headings, ags_errors={})
+    assert len(check.rule_5(line, 1, ags_errors={}, fields=fields).get('AGS Format Rule 5', [])) == errors
+
+
 def test_rule_6_1():
     # Check file that is not in CSV format
     error_list = AGS4.check_file('tests/test_files/4.1-rule6_1.ags')
@@ -332,6 +354,39 @@ def test_rule_8_9():
     assert error_list['AGS Format Rule 8'][0]['desc'] == 'Value 45:45:45,454 in LOCA_LON not of data type DMS or is an invalid value.'
 
 
+def test_rule_8_repeated_values():
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+    tables['LOCA'].loc[tables['LOCA'].HEADING.eq('DATA'), 'LOCA_NATE'] = '1.5'
+    original = tables['LOCA'].copy()
+
+    error_list = check.rule_8(tables, headings, line_numbers, ags_errors={})
+
+    # Each row with the repeated invalid value should be reported, and the table should not be modified
+    rows = tables['LOCA'].loc[tables['LOCA'].HEADING.eq('DATA'), :]
+    errors = [x for x in error_list['AGS Format Rule 8'] if 'LOCA_NATE' in x['desc']]
+
+    assert [x['line'] for x in errors] == rows['line_number'].tolist()
+    assert errors[0]['desc'] == 'Value 1.5 in LOCA_NATE not of data type 2DP.'
+    assert tables['LOCA'].equals(original)
+
+
+def test_rule_8_missing_values():
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+    is_data = tables['LOCA'].HEADING.eq('DATA')
+    tables['LOCA'].loc[is_data, 'LOCA_NATE'] = [None, '100000.01', 'abc', None]
+    tables['LOCA'].loc[is_data, 'LOCA_ID'] = [None, 'BH1', 'BH1', None]
+
+    error_list = check.rule_8(tables, headings, line_numbers, ags_errors={})
+
+    # Missing values should be treated as empty entries, and not as the last distinct value in the column
+    lines = tables['LOCA'].loc[is_data, 'line_number'].tolist()
+    errors = [(x['line'], x['desc']) for x in error_list['AGS Format Rule 8'] if x['group'] == 'LOCA']
+
+    assert sorted(errors) == [(lines[1], 'Value BH1 in LOCA_ID is not unique.'),
+                              (lines[2], 'Value BH1 in LOCA_ID is not unique.'),
+                              (lines[2], 'Value abc in LOCA_NATE not of data type 2DP.')]
+
+
 # def test_rule_9():
 #    error_list = AGS4.check_file('tests/test_files/4.1-rule9.ags', standard_AGS4_dictionary='python_ags4/Standard_dictionary_v4_1.ags')
 #
@@ -459,6 +514,44 @@ def test_rule_11_3():
     assert 'AGS Format Rule 11c' not in error_list.keys()
 
 
+def test_record_link_resolver():
+    tables, _ = AGS4.AGS4_to_dataframe(TEST_DATA)
+    resolver = check.RecordLinkResolver(tables)
+
+    record_links = [['LOCA', 'Location_1'],
+                    ['LOCA', 'Location_1', 'XXXX'],
+                    ['LOCA', 'XXXX'],
+                    ['LLPL', 'Location_1'],
+                    ['LLPL', 'Location_1', '2.00'],
+                    ['XXXX', 'Location_1'],
+                    ['LOCA'],
+                    ['LOCA'] + ['Location_1'] * 100]
+
+    # Number of matching records should be the same as that returned by fetch_record()
+    assert resolver.resolve(record_links) == [check.fetch_record(x, tables).shape[0] for x in record_links]
+    assert resolver.count(['LOCA', 'Location_1']) == 1
+    assert resolver.count(['LLPL', 'Location_1']) == 2
+
+
+def test_key_index():
+    tables, headings, line_numbers = AGS4.AGS4_to_dataframe(TEST_DATA, get_line_numbers=True)
+    key_index = check.KeyIndex(tables)
+
+    rows = key_index.rows('LLPL', ['LOCA_ID'])
+    assert rows[('Location_1',)] == tables['LLPL'].index[tables['LLPL'].LOCA_ID.eq('Location_1')].tolist()
+    assert key_index.rows('LLPL', ['LOCA_ID']) is rows
+
+    fields = ['HEADING', 'LOCA_ID']
+    assert key_index.duplicated('LLPL', fields).tolist() == tables['LLPL'].duplicated(fields, keep=False).tolist()
+
+    # Rules should give the same results with a shared index
+    tables_std_dict = check.dictionary_cache.load(check.pick_standard_dictionary(tables=tables))
+    dictionary = check.DictionaryIndex(check.combine_DICT_tables(tables_std_dict, tables))
+
+    assert check.rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}, key_index=key_index) ==\
+        check.rule_10c(tables, headings, dictionary, line_numbers, ags_errors={})
+
+
 def test_rule_12():
     error_list = AGS4.check_file('tests/test_files/4.1-rule12.ags', standard_AGS4_dictionary='python_ags4/Standard_dictionary_v4_1.ags')
 
@@ -731,6 +824,21 @@ def test_rule_20_OK():
     assert 'AGS Format Rule 20' not in error_list.keys()
 
 
+@pytest.mark.parametrize('filename, errors', [('4.1-rule20OK.ags', 0), ('4.1-rule20-3.ags', 1)])
+def test_rule_20_zip(tmp_path, filename, errors):
+    # Files in the FILE folder are checked within the zip archive
+    filepath = tmp_path / 'submission.zip'
+
+    with zipfile.ZipFile(filepath, 'w') as archive:
+        archive.write(f'tests/test_files/{filename}', filename)
+        archive.write('tests/test_files/FILE/327-16A/Report.pdf', 'FILE/327-16A/Report.pdf')
+
+    error_list = AGS4.check_file(filepath, standard_AGS4_dictionary='python_ags4/Standard_dictionary_v4_1.ags')
+
+    assert len(error_list.get('AGS Format Rule 20', [])) == errors
+    assert error_list['Metadata'][0]['desc'] == 'submission.zip'
+
+
 def test_rule_LBSGCheck():
     error_list = AGS4.check_file('tests/test_files/LBSGCheck.ags')
 
@@ -824,3 +932,136 @@ def test_data_summary():
     assert 'Summary of data' in error_list.keys()
     assert error_list['Summary of data'][0]['desc'] == 'TRAN_AGS: "4.1"'
     assert error_list['Summary of data'][1]['desc'] == '7 groups identified in file: PROJ ABBR TRAN TYPE UNIT LOCA SAMP'
+
+
+def test_dictionary_cache(tmp_path):
+    dictionary = tmp_path / 'DICT.ags'
+    dictionary.write_bytes(open('python_ags4/Standard_dictionary_v4_1.ags', 'rb').read())
+
+    cache = check.DictionaryCache(maxsize=1, cache_dir=tmp_path / 'cache')
+    tables = cache.load(dictionary)
+
+    assert len(cache) == 1
+
+    # Cached tables should be returned without being copied in a read-only mapping
+    assert cache.load(dictionary)['DICT'] is tables['DICT']
+
+    with pytest.raises(TypeError):
+        tables['DICT'] = None
+
+    # Modified file should be parsed again
+    with open(dictionary, 'a', newline='') as f:
+        f.write('\r\n"GROUP","TEST"\r\n"HEADING","TEST_ID"\r\n"UNIT",""\r\n"TYPE","X"\r\n')
+
+    assert 'TEST' in cache.load(dictionary)
+    assert len(cache) == 1
+
+    cache.load('python_ags4/Standard_dictionary_v4_1_1.ags')
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_compiled_dictionary_files(tmp_path, monkeypatch):
+    dictionary = tmp_path / 'DICT.ags'
+    dictionary.write_bytes(open('python_ags4/Standard_dictionary_v4_1.ags', 'rb').read())
+
+    tables = check.DictionaryCache(cache_dir=tmp_path / 'cache').load(dictionary)
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 1
+
+    # Compiled file should be loaded by a new cache without parsing the dictionary file
+    def parse_dictionary(*args, **kwargs):
+        raise AssertionError('Dictionary file parsed')
+
+    with monkeypatch.context() as m:
+        m.setattr(check, 'AGS4_to_dataframe', parse_dictionary)
+        compiled_tables = check.DictionaryCache(cache_dir=tmp_path / 'cache').load(dictionary)
+
+    assert compiled_tables.keys() == tables.keys()
+    assert all(compiled_tables[group].equals(tables[group]) for group in tables)
+
+    # Compiled file should be rebuilt if the dictionary file changes
+    with open(dictionary, 'a', newline='') as f:
+        f.write('\r\n"GROUP","TEST"\r\n"HEADING","TEST_ID"\r\n"UNIT",""\r\n"TYPE","X"\r\n')
+
+    assert 'TEST' in check.DictionaryCache(cache_dir=tmp_path / 'cache').load(dictionary)
+    assert 'TEST' in check.DictionaryCache(cache_dir=tmp_path / 'cache').load(dictionary)
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 2
+
+    # Files with the same contents should share a compiled file
+    copy = tmp_path / 'copy' / 'DICT.ags'
+    copy.parent.mkdir()
+    copy.write_bytes(dictionary.read_bytes())
+
+    with monkeypatch.context() as m:
+        m.setattr(check, 'AGS4_to_dataframe', parse_dictionary)
+        assert 'TEST' in check.DictionaryCache(cache_dir=tmp_path / 'cache').load(copy)
+
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='File ownership is not checked on this platform')
+def test_compiled_dictionary_files_writable_by_other_users_are_not_loaded(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    check.DictionaryCache(cache_dir=cache_dir).load('python_ags4/Standard_dictionary_v4_1.ags')
+
+    # Cache directory should only be accessible to the current user
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+    (compiled_file,) = cache_dir.glob('*.pkl')
+    compiled_file.chmod(0o666)
+
+    parsed = []
+
+    def parse_dictionary(*args, **kwargs):
+        parsed.append(args[0])
+        return AGS4.AGS4_to_dataframe(*args, **kwargs)
+
+    monkeypatch.setattr(check, 'AGS4_to_dataframe', parse_dictionary)
+    check.DictionaryCache(cache_dir=cache_dir).load('python_ags4/Standard_dictionary_v4_1.ags')
+
+    # Dictionary should be parsed again and the compiled file replaced by a private one
+    assert len(parsed) == 1
+    assert compiled_file.stat().st_mode & 0o022 == 0
+
+
+def test_compiled_dictionary_files_are_pruned(tmp_path):
+    cache = check.DictionaryCache(cache_dir=tmp_path, max_files=1)
+
+    cache.load('python_ags4/Standard_dictionary_v4_1.ags')
+    cache.load('python_ags4/Standard_dictionary_v4_1_1.ags')
+
+    # Only the most recently used compiled file should be kept
+    assert len(list(tmp_path.glob('*.pkl'))) == 1
+    assert not list(tmp_path.glob('*.tmp'))
+
+    cache.clear()
+
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(check, 'AGS4_to_dataframe', lambda *args, **kwargs: pytest.fail('Dictionary file parsed'))
+        cache.load('python_ags4/Standard_dictionary_v4_1_1.ags')
+
+
+def test_dictionary_index():
+    tables, headings = AGS4.AGS4_to_dataframe('tests/test_files/4.1-rule10-9.ags')
+    tables_std_dict, _ = AGS4.AGS4_to_dataframe('python_ags4/Standard_dictionary_v4_1.ags')
+    dictionary = check.combine_DICT_tables(tables_std_dict, tables)
+    index = check.DictionaryIndex(dictionary)
+
+    DICT = dictionary.loc[dictionary.HEADING == 'DATA', :]
+
+    for group in ['PROJ', 'LOCA', 'SAMP', 'LLPL']:
+        assert index.headings[group] == DICT.loc[DICT.DICT_GRP == group, 'DICT_HDNG'].tolist()
+
+    assert index.key_fields['SAMP'] == ['LOCA_ID', 'SAMP_TOP', 'SAMP_REF', 'SAMP_TYPE', 'SAMP_ID']
+    assert index.required_fields['PROJ'] == ['PROJ_ID']
+    assert index.parent_group['SAMP'] == 'LOCA'
+    assert index.types['SAMP_TOP'] == '2DP'
+    assert index.units['SAMP_TOP'] == 'm'
+    assert 'SAMP' in index.heading_groups['LOCA_ID']
+
+    # Rules should give the same results with an indexed or unindexed dictionary
+    line_numbers = {group: {'HEADING': 0} for group in tables}
+    assert check.rule_10c(tables, headings, dictionary, line_numbers, ags_errors={}) ==\
+        check.rule_10c(tables, headings, index, line_numbers, ags_errors={})